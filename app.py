@@ -1,60 +1,233 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify
-import nltk
-from functools import lru_cache
+from flask import Flask, current_app, has_request_context, render_template, request, redirect, url_for, jsonify, session, g
+from functools import cached_property, lru_cache
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import hmac
+import json
+import logging
+import time
 import os
 
-nltk.download("wordnet")
-
+# Importing this module must stay cheap: WordNet, the image download stack
+# and database connections are only set up when first used, and the schema
+# is created once per deployment with ``python -m model.migrate``.
 from model.word import WordRepository
 from vocab.utils import WordPicker
-from vocab.word_details import WordDetailsService
-from vocab.word_images import ImageDownloader
+from vocab.word_details import ERROR_DEFINITION, NO_DEFINITION, POS_NAMES, WordDetailsService
+from vocab.image_index import default_index
+from vocab.image_store import DEFAULT_BASE_URL, LocalImageStore, default_image_store
+from vocab.image_jobs import DONE, FAILED
+from vocab.search_index import Suggester, lemma_source
+from vocab.negative_cache import NegativeCache
+from vocab.page_cache import PageCache, content_version
+from vocab.metrics import CACHE_REQUESTS, IN_FLIGHT, REGISTRY, REQUEST_SECONDS
+from vocab import event_loop
+from vocab.event_loop import run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+class Services:
+    """The app's collaborators, each created on first use."""
+
+    def __init__(self, home_dir='./static/images/', database_url=None):
+        self.home_dir = home_dir
+        self.database_url = database_url
+        CACHE_REQUESTS.set_function(lambda: self._details_cache_stat('hits'), cache="details", result="hit")
+        CACHE_REQUESTS.set_function(lambda: self._details_cache_stat('misses'), cache="details", result="miss")
+
+    @cached_property
+    def repo(self):
+        if not os.getenv('VOCAB_CACHE_URL'):
+            return WordRepository(database_url=self.database_url)
+        from vocab.cache_store import default_cache
+
+        # Other nodes write too, so local copies only live for a short while
+        return WordRepository(database_url=self.database_url, shared_cache=default_cache(),
+                              cache_ttl=float(os.getenv('VOCAB_ENTRY_CACHE_TTL', '30')))
+
+    @cached_property
+    def negative_cache(self):
+        return NegativeCache(self.repo)
+
+    @cached_property
+    def picker(self):
+        if self.weighted_picks:
+            return WordPicker(weight_fn=self._pick_weights)
+        return WordPicker()
+
+    @property
+    def weighted_picks(self):
+        return os.getenv('VOCAB_PICK_MODE', 'shuffle') == 'weighted'
+
+    def _pick_weights(self, words):
+        """Favour words not stored yet; never pick words WordNet does not know.
+
+        Recomputed in the background after :meth:`words_changed` and every
+        few minutes (see :class:`~vocab.utils.WordPicker`).
+        """
+        keys = [w.lower() for w in words]
+        stored = self.repo.find_words(keys)
+        missing = set(self.repo.missing_words(time.time()))
+        weights = [0.0 if w in missing else 1.0 if w in stored else 2.0 for w in keys]
+        return weights if any(weights) else [1.0] * len(weights)
+
+    def words_changed(self):
+        """Note that words were stored or marked missing, which changes pick weights."""
+        if self.weighted_picks:
+            self.picker.invalidate_weights()
+
+    @cached_property
+    def details(self):
+        return WordDetailsService()
+
+    @cached_property
+    def word_details(self):
+        """``WordDetailsService.get_details`` behind an LRU cache."""
+        return lru_cache(maxsize=1000)(self.details.get_details)
+
+    def _details_cache_stat(self, name):
+        # Scraping /metrics must not be what loads the details service
+        if 'word_details' not in self.__dict__:
+            return 0
+        return getattr(self.word_details.cache_info(), name)
+
+    @cached_property
+    def image_index(self):
+        return default_index()
+
+    @cached_property
+    def image_store(self):
+        return default_image_store(self.home_dir)
+
+    @cached_property
+    def search_index(self):
+        return Suggester(lambda: self.picker.words, lambda: self.picker.mtime, lemma_source)
+
+    @cached_property
+    def page_cache(self):
+        return PageCache(int(os.getenv('VOCAB_PAGE_CACHE_SIZE', '2000')), os.getenv('VOCAB_PAGE_CACHE_DIR'),
+                         int(os.getenv('VOCAB_PAGE_CACHE_DISK_SIZE', '50000')))
+
+    @cached_property
+    def settings(self):
+        from vocab.cache_store import default_cache
+        from vocab.runtime_settings import RuntimeSettings
+
+        return RuntimeSettings(default_cache())
+
+    @cached_property
+    def image_jobs(self):
+        from vocab.image_jobs import ImageJobQueue
+        from vocab.thumbnails import ThumbnailPipeline
 
-# Initialize components
-repo = WordRepository()
-repo.create_tables()
+        return ImageJobQueue(self.home_dir, on_complete=self._store_job_images, store=self.image_store,
+                             thumbnails=ThumbnailPipeline(self.home_dir, self.image_index,
+                                                          store=self.image_store))
 
-picker = WordPicker()
-details_service = WordDetailsService()
-image_downloader = ImageDownloader()
+    def _store_job_images(self, job):
+        if job.images and job.word_id is not None:
+            self.repo.insert_images(job.word_id, job.images)
 
-app = Flask(__name__)
-executor = ThreadPoolExecutor(max_workers=4)
 
-home_dir = './static/images/'
+def services():
+    """The :class:`Services` of the current app."""
+    return current_app.extensions['vocab']
+
+
+class VocabFlask(Flask):
+    def async_to_sync(self, func):
+        """Run async views on the worker's persistent event loop.
+
+        Flask's default starts a fresh loop per request, which throws away
+        the loop's HTTP sessions and in-flight lookups every time.  The
+        request body is read here, on the request's thread, so a slow
+        client never stalls the shared loop inside ``request.get_json`` or
+        ``request.form``.
+        """
+        def run(*args, **kwargs):
+            if has_request_context():
+                request.get_data(parse_form_data=True)
+            return event_loop.run(func(*args, **kwargs))
+        return run
 
-@lru_cache(maxsize=1000)
 def get_word_details(word):
-    return details_service.get_details(word)
+    return services().word_details(word)
+
+def _refresh_settings():
+    services().settings.refresh()
+
+def _start_timer():
+    # Only requests that were counted in are counted out, even if metrics are toggled meanwhile
+    if IN_FLIGHT.inc(operation="request"):
+        g.request_started = time.perf_counter()
+
+def _stop_timer(exc):
+    started = g.pop('request_started', None)
+    if started is not None:
+        IN_FLIGHT.dec(operation="request")
+        REQUEST_SECONDS.observe(time.perf_counter() - started,
+                                endpoint=request.endpoint or 'unmatched', method=request.method)
+
+def resolve_entry(word):
+    """Return the stored entry for ``word``, looking it up and storing it if new.
+
+    Returns ``None`` without writing anything for words WordNet does not
+    know (remembered in the negative cache) and when the lookup fails.
+    """
+    word = word.lower()
+    repo, negative_cache = services().repo, services().negative_cache
+    entry = repo.get_entry(word)
+    if entry is not None or word in negative_cache:
+        return entry
+    definition, senses = get_word_details(word)
+    if definition == NO_DEFINITION:
+        negative_cache.add(word)
+        services().words_changed()
+        return None
+    if definition == ERROR_DEFINITION:
+        return None
+    repo.insert_entries([(word, senses)])
+    services().words_changed()
+    return repo.get_entry(word)
+
+# Lookups in progress on the event loop, so concurrent requests share them
+_resolving = {}
 
 async def process_word(word):
-    # Check if word exists in database
-    result = repo.find_word(word.lower())
-    if result is None:
-        # Get word details and images concurrently
-        definition, synonyms = get_word_details(word)
-        is_empty = len(definition) == 0 and len(synonyms) == 0
-        
-        # Download images in background if word has details
-        images = []
-        if not is_empty:
-            images = await image_downloader.download_async(word, home_dir)
-        
-        # Insert into database
-        word_id = repo.insert_word(word.lower())
-        repo.insert_definition(word_id, definition)
-        repo.insert_synonyms(word_id, synonyms)
-        repo.insert_images(word_id, images)
-    else:
-        definition = repo.get_definition(result['id'])
-        synonyms = repo.get_synonyms(result['id'])
-        images = repo.get_images(result['id'])
-    
-    return definition, synonyms, images
+    """Resolve ``word`` like :func:`resolve_entry` without blocking the event loop.
+
+    The word page and its image request arrive together; concurrent calls
+    for the same word wait on a single lookup.
+    """
+    key = word.lower()
+    task = _resolving.get(key)
+    if task is None:
+        task = asyncio.ensure_future(run_blocking(resolve_entry, key))
+        _resolving[key] = task
+        task.add_done_callback(lambda _: _resolving.pop(key, None))
+    return await asyncio.shield(task)
+
+def did_you_mean(word):
+    """Return a spelling correction for an unknown ``word``, or ``None``."""
+    search_index = services().search_index
+    known = search_index.is_known(word)
+    if known or known is None:
+        # Known, or the lemma index is still building and we can't tell
+        return None
+    # Inflected forms such as "geese" are not lemmas but WordNet resolves them
+    if get_word_details(word)[0] != NO_DEFINITION:
+        return None
+    suggestions = search_index.suggest(word, limit=1)
+    return suggestions[0] if suggestions else None
+
+def next_word():
+    """Next word of this visitor's no-repeat shuffle, or a weighted pick with ``VOCAB_PICK_MODE=weighted``."""
+    if services().weighted_picks:
+        return services().picker.pick()
+    word, session['shuffle'] = services().picker.pick_next(session.get('shuffle'))
+    return word
 
-@app.route('/', methods=['POST', 'GET'])
 def pick_word():
     if request.method == 'GET':
         return render_template('index.html')
@@ -62,121 +235,315 @@ def pick_word():
         form_keys = request.form.keys()
         if 'next' in form_keys:
             # Random word requested
-            return redirect(url_for('define_word', word=picker.pick()))
+            return redirect(url_for('define_word', word=next_word()))
         elif 'Word' in request.form and request.form['Word'].strip():
             # User entered a word
             word = request.form['Word'].strip()
+            suggestion = did_you_mean(word)
+            if suggestion:
+                return redirect(url_for('define_word', word=suggestion, original=word))
             return redirect(url_for('define_word', word=word))
         else:
             # Fallback: pick a random word
-            return redirect(url_for('define_word', word=picker.pick()))
-
-@app.route('/define/<string:word>/', methods=['POST', 'GET'])
-def define_word(word):
-    # Check if word exists in database
-    result = repo.find_word(word.lower())
-    if result is None:
-        # Get word details and images concurrently
-        definition, synonyms = get_word_details(word)
-        is_empty = len(definition) == 0 and len(synonyms) == 0
-        
-        # Insert into database
-        word_id = repo.insert_word(word.lower())
-        repo.insert_definition(word_id, definition)
-        repo.insert_synonyms(word_id, synonyms)
-    else:
-        definition = repo.get_definition(result['id'])
-        synonyms = repo.get_synonyms(result['id'])
-    
+            return redirect(url_for('define_word', word=next_word()))
+
+def _template_version(name):
+    versions = current_app.extensions.setdefault('template_versions', {})
+    if name not in versions:
+        source, _, _ = current_app.jinja_env.loader.get_source(current_app.jinja_env, name)
+        versions[name] = content_version(source)
+    return versions[name]
+
+def _senses_by_pos(senses):
+    """Group ``senses`` by part of speech name, in order of first appearance."""
+    groups = {}
+    for sense in senses:
+        groups.setdefault(POS_NAMES.get(sense.pos, ''), []).append(sense)
+    return list(groups.items())
+
+def render_word_page(word, entry, original=None):
+    """Return the rendered page for ``word`` (``entry`` from :func:`resolve_entry`).
+
+    Served from the page cache when possible.
+    """
+    # Unknown words are not stored
+    senses = entry.senses if entry is not None else ()
+
+    version = content_version(_template_version('word.html'), word, senses, original)
+    page_cache = services().page_cache
+    page = page_cache.get(version)
+    if page is None:
+        body = render_template('word.html', word=word, definition=entry.definition if entry else NO_DEFINITION,
+                               senses_by_pos=_senses_by_pos(senses), images=[], original=original)
+        # Unknown words and ``?original=`` variants are user-controlled; keep them off disk
+        page = page_cache.put(version, body.encode('utf-8'), persist=entry is not None and original is None)
+    return page
+
+# How long browsers and proxies may reuse a word page before revalidating
+PAGE_MAX_AGE = 3600
+
+async def define_word(word):
     if request.method == 'GET':
-        return render_template('word.html', word=word, definition=definition, synonyms=synonyms, images=[])
+        entry = await process_word(word)
+        page = await run_blocking(render_word_page, word, entry, request.args.get('original'))
+        response = current_app.response_class(page.body, mimetype='text/html')
+        response.set_etag(page.etag)
+        response.last_modified = page.last_modified
+        response.cache_control.public = True
+        response.cache_control.max_age = PAGE_MAX_AGE
+        return response.make_conditional(request)
     else:
         form_keys = request.form.keys()
         if 'next' in form_keys:
-            return redirect(url_for('define_word', word=picker.pick()))
+            return redirect(url_for('define_word', word=next_word()))
         else:
             return redirect(url_for('define_word', word=request.form['Word']))
 
-@app.route('/images/<string:word>/', methods=['GET'])
-async def get_images(word):
-    print(f"\nProcessing images for word: {word}")  # Debug
-    # Check if word exists in database
-    result = repo.find_word(word.lower())
-    images = []
-    
-    if result is None:
-        print(f"Word {word} not found in database, will create new entry")  # Debug
-        # Create new word entry
-        word_id = repo.insert_word(word.lower())
-        result = {'id': word_id}
-    else:
-        images = repo.get_images(result['id'])
-        print(f"Images from database: {images}")  # Debug
+def _image_url(img):
+    # Clean up the path - remove any prefixes and ensure it's just the filename
+    if img.startswith('./'):
+        img = img[2:]  # Remove './' prefix
+    if img.startswith('static/'):
+        img = img[7:]  # Remove 'static/' prefix
+    if img.startswith('images/'):
+        img = img[7:]  # Remove 'images/' prefix if present
     
+    store = services().image_store
+    if isinstance(store, LocalImageStore) and store.base_url == DEFAULT_BASE_URL:
+        # Ensure the path is relative to static/images
+        return url_for('static', filename=os.path.join('images', img))
+    return store.url(img)
+
+# Thumbnail width used as the plain ``src`` when a srcset is available
+DISPLAY_WIDTH = 320
+
+def _display_thumbnail(sizes):
+    return sizes[DISPLAY_WIDTH] if DISPLAY_WIDTH in sizes else sizes[max(sizes)]
+
+def _image_sources(images):
+    """Return ``(urls, srcsets)`` for ``images``, preferring thumbnails."""
+    thumbnails = services().image_index.thumbnails_for(images)
+    urls, srcsets = [], []
+    for img in images:
+        sizes = thumbnails.get(img)
+        if not sizes:
+            urls.append(_image_url(img))
+            srcsets.append('')
+            continue
+        urls.append(_image_url(_display_thumbnail(sizes)))
+        srcsets.append(', '.join(f'{_image_url(path)} {w}w' for w, path in sorted(sizes.items())))
+    return urls, srcsets
+
+async def get_images(word):
+    """Return a word's images, queueing a background download if it has none.
+
+    ``images`` holds one URL per image (a thumbnail when one exists),
+    ``srcset`` the matching responsive candidates (empty for originals) and
+    ``files`` the image's filename, which stays the same once a thumbnail
+    replaces the original URL.
+    Responds with ``status`` ``done`` once images are known, otherwise
+    ``pending``/``running`` (HTTP 202) plus whatever images the download job
+    has already saved; the word page polls until the job finishes.
+    """
+    entry = await process_word(word)
+    if entry is None:
+        # Never search images for (or store) words without a definition
+        logger.debug("Word %s is unknown, skipping images", word)
+        return jsonify({"status": DONE, "images": [], "srcset": [], "files": []})
+
+    status, files, image_urls, srcsets = await run_blocking(_entry_images, word, entry)
+    return (jsonify({"status": status, "images": image_urls, "srcset": srcsets, "files": files}),
+            200 if status in (DONE, FAILED) else 202)
+
+def _entry_images(word, entry):
+    """Return ``(status, files, urls, srcsets)`` for ``entry``, queueing a download if needed."""
+    word_id = entry.id
+    images = list(entry.images)
+    logger.debug("Images from database for %s: %s", word, images)
+    repo = services().repo
+
+    status = DONE
     if not images:
-        # Ensure the images directory exists
-        os.makedirs(home_dir, exist_ok=True)
-        
-        # Check if images exist in static directory first
-        static_images = []
-        try:
-            for filename in os.listdir(home_dir):
-                if filename.lower().startswith(word.lower()):
-                    static_images.append(filename)
-            print(f"Found static images: {static_images}")  # Debug
-        except FileNotFoundError:
-            print(f"Images directory not found: {home_dir}")  # Debug
-            os.makedirs(home_dir, exist_ok=True)
-            static_images = []
-        
+        # A download in progress has indexed only some of its files; the job
+        # stores the full set itself when it finishes
+        job = services().image_jobs.get(word)
+        if job is not None and not job.finished:
+            images = list(job.images)
+            return job.status, images, *_image_sources(images)
+
+        # Check the image index for files already downloaded for this word
+        static_images = [image.filename
+                         for image in services().image_index.files_for(word, limit=repo.MAX_IMAGES)]
+        logger.debug("Found static images for %s: %s", word, static_images)
+
         if static_images:
-            # If we found images in static directory, use those
-            word_id = result['id']
             # Insert the new images without deleting existing ones
             repo.insert_images(word_id, static_images)
             images = static_images
         else:
-            # If no static images found, trigger background image download using DuckDuckGo
-            try:
-                # Create a new image downloader instance for this request
-                downloader = ImageDownloader()
-                try:
-                    # Use DuckDuckGo API to get images
-                    new_images = await downloader.download_async(word, home_dir)
-                    print(f"Downloaded new images: {new_images}")  # Debug
-                    if new_images:  # Only insert if we got images
-                        word_id = result['id']
-                        repo.insert_images(word_id, new_images)
-                        images = new_images
-                finally:
-                    # Always close the downloader's session
-                    await downloader.close()
-            except Exception as e:
-                print(f"Error downloading images for {word}: {e}")
-                images = []
-    
-    # Convert relative paths to URLs
-    image_urls = []
-    for img in images:
-        print(f"Processing image path: {img}")  # Debug
-        # Clean up the path - remove any prefixes and ensure it's just the filename
-        if img.startswith('./'):
-            img = img[2:]  # Remove './' prefix
-        if img.startswith('static/'):
-            img = img[7:]  # Remove 'static/' prefix
-        if img.startswith('images/'):
-            img = img[7:]  # Remove 'images/' prefix if present
-        
-        # Ensure the path is relative to static/images
-        if not img.startswith('images/'):
-            img = os.path.join('images', img)
-        
-        final_url = url_for('static', filename=img)
-        print(f"Generated URL: {final_url}")  # Debug
-        image_urls.append(final_url)
-    
-    print(f"Final image URLs: {image_urls}")  # Debug
-    return jsonify({"images": image_urls})
+            # Download in the background; requests for the same word share one job
+            job = services().image_jobs.submit(word, word_id)
+            status = job.status
+            images = list(job.images)
+
+    image_urls, srcsets = _image_sources(images)
+    logger.debug("Final image URLs for %s (%s): %s", word, status, image_urls)
+    return status, images, image_urls, srcsets
+
+def api_suggest():
+    """Autocomplete ``q`` with prefix matches, plus spelling suggestions when few match.
+
+    Results are cacheable for an hour once the search indexes are built;
+    until then they may widen at any moment, so they are not stored.
+    """
+    query = request.args.get('q', '').strip()[:64]
+    search_index = services().search_index
+    ready = search_index.ready
+    completions = search_index.complete(query) if query else []
+    suggestions = search_index.suggest(query) if len(query) >= 3 and len(completions) < 3 else []
+    response = jsonify({"query": query, "completions": completions, "suggestions": suggestions})
+    if ready:
+        response.cache_control.public = True
+        response.cache_control.max_age = 3600
+    else:
+        response.cache_control.no_store = True
+    return response
+
+def _resolve_many(words):
+    """Look up ``words`` in one batch and store them; return the new entries."""
+    repo = services().repo
+    found = []
+    for w, (definition, senses) in services().details.get_many(words).items():
+        if definition == NO_DEFINITION:
+            services().negative_cache.add(w)
+        elif definition != ERROR_DEFINITION:
+            found.append((w, senses))
+    services().words_changed()
+    if not found:
+        return {}
+    repo.insert_entries(found)
+    return repo.get_entries([w for w, _ in found])
+
+# Upper bound on words per /api/words request
+MAX_BATCH_WORDS = 200
+
+async def api_words():
+    """Return senses, synonyms and image URLs for many words at once.
+
+    Accepts ``GET /api/words?w=a&w=b`` (or ``?w=a,b``) and ``POST`` with
+    ``{"words": [...]}``. Stored words are loaded with one batched query;
+    the rest are looked up in one batch and inserted in one transaction.
+    Unknown words map to ``null`` and are not stored. Images are not
+    downloaded here; words without images get an empty list.
+
+    Both methods return the same ETag for the same result, but only GET is
+    cacheable (``private, max-age=60``) and answers ``If-None-Match`` with
+    304, so clients that want caching should use GET.
+    """
+    if request.method == 'GET':
+        words = [w for value in request.args.getlist('w') for w in value.split(',')]
+    else:
+        payload = request.get_json(silent=True)
+        words = payload.get('words') if isinstance(payload, dict) else None
+        if not isinstance(words, list) or not all(isinstance(w, str) for w in words):
+            return jsonify({"error": "expected a JSON body like {\"words\": [\"...\"]}"}), 400
+    words = list(dict.fromkeys(w.strip().lower() for w in words if w.strip()))
+    if len(words) > MAX_BATCH_WORDS:
+        return jsonify({"error": f"at most {MAX_BATCH_WORDS} words per request"}), 400
+
+    repo, negative_cache = services().repo, services().negative_cache
+    entries = await run_blocking(repo.get_entries, words)
+    misses = await run_blocking(lambda: [w for w in words if w not in entries and w not in negative_cache])
+    if misses:
+        entries.update(await run_blocking(_resolve_many, misses))
+
+    all_images = [img for entry in entries.values() for img in entry.images]
+    thumbnails = await run_blocking(services().image_index.thumbnails_for, all_images)
+    result = {}
+    for word in words:
+        entry = entries.get(word)
+        if entry is None:
+            result[word] = None
+            continue
+        images = [_image_url(_display_thumbnail(thumbnails[img]) if img in thumbnails else img)
+                  for img in entry.images]
+        result[word] = {"definition": entry.definition, "synonyms": entry.synonyms,
+                        "senses": [sense._asdict() for sense in entry.senses], "images": images}
+
+    body = json.dumps({"words": result}, separators=(',', ':'))
+    etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+    # Conditional requests only apply to GET (RFC 9110 section 13.1.2)
+    if request.method == 'GET' and request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    if request.method == 'GET':
+        response.cache_control.private = True
+        response.cache_control.max_age = 60
+    else:
+        response.cache_control.no_store = True
+    return response
+
+def metrics():
+    """Prometheus metrics for this worker; POST switches recording and log level.
+
+    POST requires ``Authorization: Bearer $METRICS_TOKEN`` and accepts
+    ``enabled`` (``1``/``0``) and ``log_level`` (e.g. ``DEBUG``) form fields.
+    The switch applies to every worker sharing the cache backend (see
+    :mod:`vocab.runtime_settings`), not just the one that answers.
+    """
+    if request.method == 'POST':
+        token = os.getenv('METRICS_TOKEN')
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not token or not hmac.compare_digest(supplied, token):
+            return jsonify({"error": "forbidden"}), 403
+        enabled = request.form.get('enabled')
+        try:
+            settings = services().settings.update(
+                enabled=None if enabled is None else enabled.lower() in ('1', 'true', 'on'),
+                log_level=request.form.get('log_level'))
+        except ValueError:
+            return jsonify({"error": "unknown log level"}), 400
+        return jsonify(settings)
+    if not REGISTRY.enabled:
+        return jsonify({"error": "metrics are disabled"}), 404
+    return current_app.response_class(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+def create_app(home_dir='./static/images/', database_url=None):
+    """Build the Flask app.
+
+    Cheap by design: no network, corpus loading or database access happens
+    until a request needs it.
+    """
+    # Set LOG_LEVEL=DEBUG to see every lookup and download step
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'WARNING').upper(),
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    app = VocabFlask(__name__)
+    # Signs the session cookie holding each visitor's word shuffle. Set SECRET_KEY
+    # so all workers share it; otherwise shuffles restart when a worker changes.
+    app.secret_key = os.getenv('SECRET_KEY')
+    if not app.secret_key:
+        app.secret_key = os.urandom(32)
+        if os.getenv('ENVIRONMENT', '') != 'local':
+            logger.warning("SECRET_KEY is not set; word shuffles reset on restarts and across workers")
+    app.extensions['vocab'] = Services(home_dir, database_url)
+
+    app.before_request(_refresh_settings)
+    app.before_request(_start_timer)
+    app.teardown_request(_stop_timer)
+    app.add_url_rule('/', view_func=pick_word, methods=['POST', 'GET'])
+    app.add_url_rule('/define/<string:word>/', view_func=define_word, methods=['POST', 'GET'])
+    app.add_url_rule('/images/<string:word>/', view_func=get_images, methods=['GET'])
+    app.add_url_rule('/api/suggest', view_func=api_suggest, methods=['GET'])
+    app.add_url_rule('/api/words', view_func=api_words, methods=['GET', 'POST'])
+    app.add_url_rule('/metrics', view_func=metrics, methods=['GET', 'POST'])
+    return app
+
+app = create_app()
 
 if __name__ == '__main__':
+    # The development server creates the schema itself
+    from model.migrate import migrate
+    migrate()
     app.run(threaded=True)
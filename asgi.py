@@ -0,0 +1,146 @@
+"""ASGI entry point: ``uvicorn asgi:application --workers 4``.
+
+Flask stays a WSGI app.  :class:`WsgiBridge` reads each request body on the
+server's event loop, then runs the WSGI call on a thread from a large pool.
+The server's loop also becomes the worker's loop for async views and image
+jobs (see :func:`vocab.event_loop.adopt`), so a worker runs one event loop.
+
+Requests are still bounded by threads: every in-flight request holds one of
+the ``VOCAB_ASGI_THREADS`` (default 256) pool threads until it responds,
+mostly waiting on the event loop, and further requests queue for a free
+thread.  Idle waiting threads are cheap, so the limit can be raised well
+beyond the number of CPUs.
+"""
+
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+from app import app
+from vocab import event_loop
+
+
+class WsgiBridge:
+    """Serve a WSGI app over ASGI (HTTP and lifespan) on a thread pool."""
+
+    def __init__(self, wsgi_application, threads: int = 256) -> None:
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='request')
+
+    async def __call__(self, scope, receive, send):
+        event_loop.adopt(asyncio.get_running_loop())
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"unsupported ASGI scope type {scope['type']!r}")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        with SpooledTemporaryFile(max_size=65536) as body:
+            # The whole body arrives before a thread is taken, so slow clients cost no thread
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+                body.write(message.get('body', b''))
+                if not message.get('more_body'):
+                    break
+            body.seek(0)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self._respond, scope, body, loop, send)
+
+    @staticmethod
+    def environ(scope, body) -> dict:
+        """PEP 3333 environ for an ASGI HTTP ``scope``."""
+        script_name = scope.get('root_path', '').encode('utf8').decode('latin1')
+        path_info = scope['path'].encode('utf8').decode('latin1')
+        if path_info.startswith(script_name):
+            path_info = path_info[len(script_name):]
+        server = scope.get('server') or ('localhost', 80)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': script_name,
+            'PATH_INFO': path_info,
+            'QUERY_STRING': scope['query_string'].decode('ascii'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        if scope.get('client'):
+            environ['REMOTE_ADDR'] = scope['client'][0]
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin1')
+            if name == 'content-length':
+                key = 'CONTENT_LENGTH'
+            elif name == 'content-type':
+                key = 'CONTENT_TYPE'
+            else:
+                key = f"HTTP_{name.upper().replace('-', '_')}"
+            value = value.decode('latin1')
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+        return environ
+
+    def _respond(self, scope, body, loop, send):
+        def send_sync(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and started.get('sent'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            started['message'] = {
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [(name.lower().encode('latin1'), value.encode('latin1')) for name, value in headers],
+            }
+            started['length'] = next((int(value) for name, value in headers
+                                      if name.lower() == 'content-length'), None)
+
+        def begin():
+            if not started.get('sent'):
+                started['sent'] = True
+                send_sync(started['message'])
+
+        result = self.wsgi_application(self.environ(scope, body), start_response)
+        sent = 0
+        try:
+            for chunk in result:
+                begin()
+                length = started['length']
+                if length is not None:
+                    # Never send more than the declared Content-Length
+                    chunk = chunk[:length - sent]
+                if chunk:
+                    send_sync({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                    sent += len(chunk)
+                if length is not None and sent >= length:
+                    break
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        begin()
+        send_sync({'type': 'http.response.body'})
+
+
+application = WsgiBridge(app, int(os.getenv('VOCAB_ASGI_THREADS', '256')))
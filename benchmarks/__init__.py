@@ -0,0 +1 @@
+"""Benchmarks for the vocabulary app. Run modules with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,157 @@
+"""End-to-end load test of the Flask app.
+
+Usage::
+
+    python -m benchmarks.load [--concurrency 1 4 16] [--seconds 5] [--output results/load.json]
+
+The app is started in a subprocess inside a temporary directory (its own
+SQLite databases, caches and image directory) with image search pointed at
+:mod:`benchmarks.stub_images`, so no network is needed as long as
+``VOCAB_LEXICON_INDEX`` points at a lexicon index (otherwise the app
+downloads WordNet on its first lookup).  For every path and concurrency level, client
+threads issue requests over keep-alive connections for ``--seconds``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+from benchmarks.results import print_table, summarize, write_results
+from benchmarks.stub_images import start as start_stub
+
+ROOT = Path(__file__).resolve().parent.parent
+PATHS = ("/", "/define/{word}/", "/images/{word}/")
+
+SERVER = """
+import sys
+from model.migrate import migrate
+migrate()
+from app import app
+app.run(host="127.0.0.1", port=int(sys.argv[1]), threaded=True, use_reloader=False)
+"""
+
+
+def free_port() -> int:
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(workdir: str, port: int, search_url: str, word_file: str) -> subprocess.Popen:
+    shutil.copy(word_file, os.path.join(workdir, "wordlist.txt"))
+    env = dict(os.environ,
+               PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.getenv("PYTHONPATH")])),
+               ENVIRONMENT="local",
+               VOCAB_IMAGE_SEARCH_URL=search_url,
+               VOCAB_CACHE_DB=os.path.join(workdir, "cache.db"),
+               VOCAB_IMAGE_INDEX=os.path.join(workdir, "image_index.db"))
+    if env.get("VOCAB_LEXICON_INDEX"):
+        env["VOCAB_LEXICON_INDEX"] = os.path.abspath(env["VOCAB_LEXICON_INDEX"])
+    process = subprocess.Popen([sys.executable, "-c", SERVER, str(port)], cwd=workdir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"app exited with status {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("app did not start in time")
+
+
+def run_level(port: int, template: str, words: List[str], concurrency: int,
+              seconds: float) -> Dict[str, Any]:
+    """Hammer ``template`` with ``concurrency`` client threads for ``seconds``."""
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def client(slot: int) -> None:
+        rng = random.Random(slot)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local, failed = [], 0
+        while not stop.is_set():
+            path = template.format(word=quote(rng.choice(words)))
+            t0 = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    failed += 1
+                local.append(time.perf_counter() - t0)
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return {"path": template, "concurrency": concurrency, **summarize(latencies, elapsed, errors[0])}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--paths", nargs="+", default=list(PATHS))
+    parser.add_argument("--word-file", default="wordlist.txt")
+    parser.add_argument("--stub-delay", type=float, default=0.0,
+                        help="latency added to every stub image response")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    words = [w.strip() for w in Path(args.word_file).read_text(encoding="utf-8").splitlines() if w.strip()]
+    stub, search_url = start_stub(delay=args.stub_delay)
+    port = free_port()
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        app = start_app(workdir, port, search_url, args.word_file)
+        try:
+            for template in args.paths:
+                for concurrency in args.concurrency:
+                    results.append(run_level(port, template, words, concurrency, args.seconds))
+        finally:
+            app.terminate()
+            app.wait(timeout=10)
+            stub.shutdown()
+    for row in results:
+        row["label"] = f"{row['path']} c={row['concurrency']}"
+    print_table(results, "label")
+    write_results(args.output, "load", vars(args), results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Micro-benchmarks for the repository, word details and the word picker.
+
+Usage::
+
+    python -m benchmarks.micro [--words 2000] [--iterations 2000] [--output results/micro.json]
+
+Repository benchmarks run against a temporary SQLite database filled with
+synthetic words.  Word details are looked up for the words in
+``--word-file`` through a fresh :class:`WordDetailsService` (``cold`` is the
+first lookup of each word, ``warm`` the second, ``lru`` goes through an
+``lru_cache`` like ``app.get_word_details``, ``get_many`` looks up the whole
+list in one batch with a fresh service); ``load`` is the one-off cost of the
+very first lookup, which loads WordNet or the lexicon index.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.repository_threads import populate, synthetic_senses
+from benchmarks.results import print_table, summarize, write_results
+from model.connection import SqliteConnectionManager
+from model.word import WordRepository
+from vocab.utils import WordPicker
+from vocab.word_details import WordDetailsService
+
+
+def timed(name: str, calls: List[Callable[[], Any]]) -> Dict[str, Any]:
+    """Run every call once, timing each one."""
+    latencies = []
+    started = time.perf_counter()
+    for call in calls:
+        t0 = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - t0)
+    return {"name": name, **summarize(latencies, time.perf_counter() - started)}
+
+
+def repository_benchmarks(tmp: str, words: int, iterations: int) -> List[Dict[str, Any]]:
+    rng = random.Random(0)
+    cached = WordRepository(cache_size=words,
+                            connections=SqliteConnectionManager(os.path.join(tmp, "micro.db")))
+    cached.create_tables()
+    names = populate(cached, words)
+    uncached = WordRepository(cache_size=0, connections=cached.db)
+    cached.get_entries(names)
+    sample = [rng.choice(names) for _ in range(iterations)]
+    batches = [rng.sample(names, 50) for _ in range(max(1, iterations // 50))]
+    fresh = [[f"new{i}_{j}" for j in range(100)] for i in range(max(1, iterations // 100))]
+    ids = cached.find_words(names)
+
+    results = [
+        timed("repo.get_entry (cache hit)", [lambda w=w: cached.get_entry(w) for w in sample]),
+        timed("repo.get_entry (database)", [lambda w=w: uncached.get_entry(w) for w in sample]),
+        timed("repo.get_entries x50", [lambda b=b: uncached.get_entries(b) for b in batches]),
+        timed("repo.insert_entries x100", [
+            lambda b=b: cached.insert_entries((w, synthetic_senses(w)) for w in b)
+            for b in fresh]),
+        timed("repo.insert_images", [
+            lambda w=w: cached.insert_images(ids[w], [f"{w}-extra.jpg"]) for w in sample[:iterations // 4]]),
+    ]
+    cached.close()
+    return results
+
+
+def details_benchmarks(word_file: str, iterations: int) -> List[Dict[str, Any]]:
+    words = WordPicker(word_file).words[:iterations] or ["example"]
+    services: List[WordDetailsService] = []
+
+    def load() -> None:
+        services.append(WordDetailsService())
+        services[0].get_details(words[0])
+
+    results = [timed("details load", [load])]
+    service = services[0]
+    cached_details = lru_cache(maxsize=1000)(service.get_details)
+    return results + [
+        timed("details cold", [lambda w=w: service.get_details(w) for w in words[1:] or words]),
+        timed("details warm", [lambda w=w: service.get_details(w) for w in words]),
+        timed("details lru", [lambda w=w: cached_details(w) for w in words + words]),
+        timed("details get_many", [lambda: WordDetailsService().get_many(words)]),
+    ]
+
+
+def picker_benchmarks(word_file: str, iterations: int) -> List[Dict[str, Any]]:
+    picker = WordPicker(word_file)
+    if not picker.words:
+        return []
+    state: Dict[str, Optional[dict]] = {"shuffle": None}
+
+    def pick_next() -> None:
+        _, state["shuffle"] = picker.pick_next(state["shuffle"])
+
+    return [
+        timed("picker.pick", [picker.pick] * iterations),
+        timed("picker.pick_next", [pick_next] * iterations),
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.micro")
+    parser.add_argument("--words", type=int, default=2000, help="synthetic words in the test database")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--word-file", default="wordlist.txt")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = repository_benchmarks(tmp, args.words, args.iterations)
+    results += details_benchmarks(args.word_file, args.iterations)
+    results += picker_benchmarks(args.word_file, args.iterations)
+    print_table(results, "name")
+    write_results(args.output, "micro", vars(args), results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
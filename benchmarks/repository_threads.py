@@ -0,0 +1,90 @@
+"""Measure WordRepository read throughput as worker threads are added.
+
+Usage::
+
+    python -m benchmarks.repository_threads [--words 5000] [--seconds 2] [--threads 1 2 4 8]
+
+A temporary SQLite database is filled with synthetic words and every thread
+repeatedly calls ``get_entry`` with the entry cache disabled, so each call
+hits the database through its own WAL read connection.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from model.connection import SqliteConnectionManager
+from model.word import WordRepository
+from vocab.word_details import Sense
+
+
+def synthetic_senses(word: str, count: int = 3) -> tuple[Sense, ...]:
+    """Senses shaped like a typical WordNet entry."""
+    return tuple(Sense("n", f"definition {i} of {word}", (f"an example of {word}",),
+                       tuple(f"{word}_syn{i}{j}" for j in range(4)), (f"{word}_ant{i}",))
+                 for i in range(count))
+
+
+def populate(repo: WordRepository, count: int) -> list[str]:
+    words = [f"word{i}" for i in range(count)]
+    repo.insert_entries((w, synthetic_senses(w)) for w in words)
+    ids = repo.find_words(words)
+    for word in words[: count // 2]:
+        repo.insert_images(ids[word], [f"{word}{j}.jpg" for j in range(1, 4)])
+    return words
+
+
+def measure(repo: WordRepository, words: list[str], threads: int, seconds: float) -> float:
+    """Return ``get_entry`` calls per second across ``threads`` threads."""
+    counts = [0] * threads
+    stop = threading.Event()
+
+    def worker(slot: int) -> None:
+        rng = random.Random(slot)
+        n = 0
+        while not stop.is_set():
+            repo.get_entry(rng.choice(words))
+            n += 1
+        counts[slot] = n
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in pool:
+        t.join()
+    return sum(counts) / seconds
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.repository_threads")
+    parser.add_argument("--words", type=int, default=5000)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = WordRepository(cache_size=0,
+                              connections=SqliteConnectionManager(os.path.join(tmp, "bench.db")))
+        repo.create_tables()
+        words = populate(repo, args.words)
+        baseline = None
+        print(f"{'threads':>8} {'reads/s':>12} {'speedup':>8}")
+        for threads in args.threads:
+            rate = measure(repo, words, threads, args.seconds)
+            baseline = baseline or rate
+            print(f"{threads:>8} {rate:>12.0f} {rate / baseline:>7.2f}x")
+        repo.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
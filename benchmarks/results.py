@@ -0,0 +1,73 @@
+"""Latency summaries and JSON result files shared by the benchmarks.
+
+Every result file records the git commit it was measured on, so runs from
+different commits can be compared side by side.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted ``sorted_values``."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: Sequence[float], seconds: float, errors: int = 0) -> Dict[str, Any]:
+    """Summarize per-operation ``latencies`` (seconds) measured over ``seconds``."""
+    ordered = sorted(latencies)
+    ms = 1000.0
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "throughput": len(ordered) / seconds if seconds else 0.0,
+        "mean_ms": sum(ordered) / len(ordered) * ms if ordered else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * ms,
+        "p95_ms": percentile(ordered, 0.95) * ms,
+        "p99_ms": percentile(ordered, 0.99) * ms,
+        "max_ms": ordered[-1] * ms if ordered else 0.0,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: Optional[str], benchmark: str, params: Dict[str, Any],
+                  results: Any) -> Dict[str, Any]:
+    """Wrap ``results`` with run metadata and write them to ``path`` (if given)."""
+    payload = {
+        "benchmark": benchmark,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+    if path:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote {path}")
+    return payload
+
+
+def print_table(rows: Sequence[Dict[str, Any]], label: str) -> None:
+    print(f"{label:<28} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for row in rows:
+        print(f"{row[label]:<28} {row['throughput']:>10.1f} {row['p50_ms']:>9.3f} "
+              f"{row['p95_ms']:>9.3f} {row['p99_ms']:>9.3f} {row['errors']:>7}")
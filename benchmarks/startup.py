@@ -0,0 +1,94 @@
+"""Cold-start time of a worker.
+
+Usage::
+
+    python -m benchmarks.startup [--runs 10] [--word ephemeral] [--output results/startup.json]
+
+Each run starts a fresh interpreter inside a temporary directory whose
+schema was created beforehand (as ``python -m model.migrate`` would in a
+release step) and times, in order: importing the app module (which builds
+the app), the first ``/`` request and the first ``/define/<word>/`` request
+through Flask's test client.  The first word lookup includes loading the
+lexicon, so set ``VOCAB_LEXICON_INDEX`` to compare against NLTK.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+from benchmarks.results import print_table, summarize, write_results
+
+ROOT = Path(__file__).resolve().parent.parent
+PHASES = ("import", "first_index", "first_define")
+
+WORKER = """
+import json, sys, time
+started = time.perf_counter()
+from app import app
+timings = {"import": time.perf_counter() - started}
+client = app.test_client()
+for phase, path in (("first_index", "/"), ("first_define", sys.argv[1])):
+    started = time.perf_counter()
+    status = client.get(path).status_code
+    timings[phase] = time.perf_counter() - started
+    if status >= 400:
+        sys.exit(f"{path} answered {status}")
+print(json.dumps(timings))
+"""
+
+
+def measure(workdir: str, env: Dict[str, str], word: str) -> Dict[str, float]:
+    """Time one cold start; return seconds per phase."""
+    output = subprocess.run([sys.executable, "-c", WORKER, f"/define/{quote(word)}/"], cwd=workdir,
+                            env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--word", default="ephemeral")
+    parser.add_argument("--word-file", default="wordlist.txt")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    timings: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+    with tempfile.TemporaryDirectory() as workdir:
+        shutil.copy(args.word_file, os.path.join(workdir, "wordlist.txt"))
+        env = dict(os.environ,
+                   PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.getenv("PYTHONPATH")])),
+                   ENVIRONMENT="local",
+                   VOCAB_CACHE_DB=os.path.join(workdir, "cache.db"),
+                   VOCAB_IMAGE_INDEX=os.path.join(workdir, "image_index.db"))
+        if env.get("VOCAB_LEXICON_INDEX"):
+            env["VOCAB_LEXICON_INDEX"] = os.path.abspath(env["VOCAB_LEXICON_INDEX"])
+        subprocess.run([sys.executable, "-m", "model.migrate"], cwd=workdir, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+        for _ in range(args.runs):
+            # Start every run from the freshly migrated schema and an empty
+            # details cache, so each one pays for its lookup
+            shutil.copy(os.path.join(workdir, "sqlite.db"), os.path.join(workdir, "run.db"))
+            for name in ("run_cache.db", "run_cache.db-wal", "run_cache.db-shm"):
+                Path(workdir, name).unlink(missing_ok=True)
+            run_env = dict(env, ENVIRONMENT="", DATABASE_URL="sqlite:///run.db",
+                           VOCAB_CACHE_DB=os.path.join(workdir, "run_cache.db"))
+            for phase, seconds in measure(workdir, run_env, args.word).items():
+                timings[phase].append(seconds)
+
+    results = [{"phase": phase, **summarize(values, sum(values))} for phase, values in timings.items()]
+    print_table(results, "phase")
+    write_results(args.output, "startup", vars(args), results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
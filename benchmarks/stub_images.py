@@ -0,0 +1,95 @@
+"""Local stand-in for the image search and image hosts.
+
+Serves ``/search?q=<keyword>`` in the format expected by
+``ImageDownloader`` when ``VOCAB_IMAGE_SEARCH_URL`` is set, and small
+generated PNGs under ``/img/``, so load tests never touch the network::
+
+    python -m benchmarks.stub_images --port 8765 [--delay 0.05]
+    VOCAB_IMAGE_SEARCH_URL=http://127.0.0.1:8765/search python app.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import struct
+import sys
+import threading
+import time
+import zlib
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlparse
+
+RESULTS_PER_SEARCH = 10
+
+
+@lru_cache(maxsize=256)
+def png(seed: int, size: int = 64) -> bytes:
+    """A ``size`` x ``size`` single-colour PNG whose colour depends on ``seed``."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    colour = bytes(((seed * 67) % 256, (seed * 131) % 256, (seed * 199) % 256))
+    rows = b"".join(b"\x00" + colour * size for _ in range(size))
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.delay:
+            time.sleep(self.delay)
+        url = urlparse(self.path)
+        host = f"http://{self.headers.get('Host', '127.0.0.1')}"
+        if url.path == "/search":
+            keyword = parse_qs(url.query).get("q", [""])[0]
+            results = [{"title": f"{keyword} {i}", "image": f"{host}/img/{quote(keyword)}-{i}.png"}
+                       for i in range(RESULTS_PER_SEARCH)]
+            self._send(200, "application/json", json.dumps(results).encode("utf-8"))
+        elif url.path.startswith("/img/") and url.path.endswith(".png"):
+            self._send(200, "image/png", png(zlib.crc32(url.path.encode("utf-8")) % 256))
+        else:
+            self._send(404, "text/plain", b"not found")
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def start(port: int = 0, delay: float = 0.0) -> Tuple[ThreadingHTTPServer, str]:
+    """Serve the stub on a daemon thread; return the server and its search URL."""
+    handler = type("Handler", (StubHandler,), {"delay": delay})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-images", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/search"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.stub_images")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before each response")
+    args = parser.parse_args(argv)
+    server, search_url = start(args.port, args.delay)
+    print(f"Serving stub image search at {search_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""Create or upgrade the database schema.
+
+Run once per deployment (e.g. as a release command), not in every worker::
+
+    python -m model.migrate [--database-url URL] [--wordnet]
+
+``--wordnet`` also downloads the NLTK WordNet corpus if it is missing, so
+the first request does not have to (not needed with ``VOCAB_LEXICON_INDEX``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+from model.connection import default_database_url
+from model.word import WordRepository
+
+
+def migrate(database_url: Optional[str] = None) -> None:
+    repo = WordRepository(database_url=database_url or default_database_url())
+    try:
+        repo.create_tables()
+    finally:
+        repo.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m model.migrate", description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL, or sqlite.db locally")
+    parser.add_argument("--wordnet", action="store_true", help="download the WordNet corpus if missing")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    migrate(args.database_url)
+    print(f"Schema is up to date ({time.perf_counter() - started:.2f}s)")
+    if args.wordnet:
+        from vocab.word_details import load_wordnet
+
+        load_wordnet()
+        print("WordNet corpus is available")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,130 +1,443 @@
-from peewee import SqliteDatabase, Model, CharField
-import sqlite3
-import os
-from functools import lru_cache
-from playhouse.db_url import connect
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
 
-db = SqliteDatabase('sqlite.db')
+from model.connection import connection_manager, default_database_url
+from vocab.metrics import DB_QUERY_SECONDS, cache_result
+from vocab.word_details import (ERROR_DEFINITION, NO_DEFINITION, Sense, pack_senses, ranked_synonyms,
+                                unpack_senses)
 
-if os.getenv('ENVIRONMENT', '') == 'local':
-    db = SqliteDatabase('sqlite.db')
-else:
-    db = connect(os.getenv('DATABASE_URL', ''))
 
+class WordEntry(NamedTuple):
+    """Everything stored for a single word, loaded in one query."""
 
-class WordData(Model):
-    word = CharField()
-    definition = CharField(null=True)
-    synonym = CharField(null=True)
-    image = CharField(null=True)
+    id: int
+    word: str
+    senses: Tuple[Sense, ...]
+    images: Tuple[str, ...]
 
-    class Meta:
-        database = db
+    @property
+    def definition(self) -> str:
+        return self.senses[0].definition if self.senses else ""
+
+    @property
+    def synonyms(self) -> List[str]:
+        return ranked_synonyms(self.senses)
+
+
+class EntryCache:
+    """Bounded, thread-safe LRU cache of :class:`WordEntry` keyed by word.
+
+    With a ``ttl`` entries are also dropped after that many seconds, which
+    bounds how long another node's writes can go unnoticed.
+    """
+
+    def __init__(self, maxsize=1000, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._expires = {}
+        self._words_by_id = {}
+        self._lock = threading.Lock()
+
+    def get(self, word):
+        with self._lock:
+            entry = self._entries.get(word)
+            if entry is not None and self.ttl is not None and self._expires[word] <= time.monotonic():
+                del self._entries[word]
+                del self._expires[word]
+                self._words_by_id.pop(entry.id, None)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(word)
+        cache_result("entries", entry is not None)
+        return entry
+
+    def put(self, entry):
+        with self._lock:
+            self._entries[entry.word] = entry
+            self._entries.move_to_end(entry.word)
+            if self.ttl is not None:
+                self._expires[entry.word] = time.monotonic() + self.ttl
+            self._words_by_id[entry.id] = entry.word
+            while len(self._entries) > self.maxsize:
+                _, evicted = self._entries.popitem(last=False)
+                self._expires.pop(evicted.word, None)
+                self._words_by_id.pop(evicted.id, None)
+
+    def invalidate(self, word):
+        with self._lock:
+            entry = self._entries.pop(word, None)
+            self._expires.pop(word, None)
+            if entry is not None:
+                self._words_by_id.pop(entry.id, None)
+
+    def invalidate_id(self, word_id):
+        with self._lock:
+            word = self._words_by_id.pop(word_id, None)
+            if word is not None:
+                self._entries.pop(word, None)
+                self._expires.pop(word, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._expires.clear()
+            self._words_by_id.clear()
+
+
+def _timed(method):
+    """Record each call's duration in ``vocab_db_query_seconds``."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with DB_QUERY_SECONDS.time(method=method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _encode_entry(entry: WordEntry) -> list:
+    return [entry.id, pack_senses(entry.senses), list(entry.images)]
+
+
+def _decode_entry(word: str, value: list) -> WordEntry:
+    word_id, senses, images = value
+    return WordEntry(id=word_id, word=word, senses=unpack_senses(senses), images=tuple(images))
+
+
+def _chunks(items: Sequence, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
 
 
 class WordRepository:
-    """Utility class wrapping common database operations."""
+    """Utility class wrapping common database operations.
+
+    Connections come from :mod:`model.connection`: by default the local
+    ``sqlite.db`` in WAL mode, or a pooled ``DATABASE_URL`` database.
+    Everything WordNet knows about a word is packed into a single
+    ``senses`` row (see :func:`vocab.word_details.pack_senses`).
+    Nothing is created on construction; run ``python -m model.migrate`` (or
+    :meth:`create_tables`) once per database.
 
-    def __init__(self):
-        self.conn = sqlite3.connect('sqlite.db', check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
-        self.create_tables()
+    Entries are cached in a per-process LRU (``cache_size``, optionally
+    expiring after ``cache_ttl`` seconds) and, given a ``shared_cache``
+    from :mod:`vocab.cache_store`, in a cache shared with other processes
+    and nodes.  Writes through this class invalidate both.
+    """
+
+    # Maximum number of images returned for a word
+    MAX_IMAGES = 3
+    # Stay well below SQLite's default limit on bound parameters
+    MAX_PARAMS = 500
+    # Shared cache namespace and lifetime of entries stored there
+    SHARED_NAMESPACE = 'entries'
+    SHARED_TTL = 24 * 3600
+
+    def __init__(self, cache_size=1000, database_url=None, connections=None, shared_cache=None,
+                 cache_ttl=None):
+        if connections is None:
+            connections = connection_manager(database_url or default_database_url())
+        self.db = connections
+        self.cache = EntryCache(cache_size, cache_ttl)
+        self.shared_cache = shared_cache
+
+    def close(self):
+        self.db.close()
 
     def create_tables(self):
-        cursor = self.conn.cursor()
-        # Add indexes for faster lookups
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS words (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                word TEXT UNIQUE NOT NULL
-            )
-        ''')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_word ON words(word)')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS definitions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                word_id INTEGER NOT NULL,
-                definition TEXT NOT NULL,
-                FOREIGN KEY (word_id) REFERENCES words(id)
-            )
-        ''')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_word_id ON definitions(word_id)')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS synonyms (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                word_id INTEGER NOT NULL,
-                synonym TEXT NOT NULL,
-                FOREIGN KEY (word_id) REFERENCES words(id)
-            )
-        ''')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_synonym_word_id ON synonyms(word_id)')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS images (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                word_id INTEGER NOT NULL,
-                image_path TEXT NOT NULL,
-                FOREIGN KEY (word_id) REFERENCES words(id)
+        pk = self.db.primary_key
+        with self.db.writer() as conn:
+            # Add indexes for faster lookups
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS words (
+                    id {pk},
+                    word TEXT UNIQUE NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_word ON words(word)')
+
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS senses (
+                    word_id INTEGER PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    FOREIGN KEY (word_id) REFERENCES words(id)
+                )
+            ''')
+
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS images (
+                    id {pk},
+                    word_id INTEGER NOT NULL,
+                    image_path TEXT NOT NULL,
+                    FOREIGN KEY (word_id) REFERENCES words(id)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_image_word_id ON images(word_id)')
+            # Workers and nodes store images concurrently; the index keeps one row per path.
+            # Older databases can hold duplicates, which must go before it can be created.
+            conn.execute('''
+                DELETE FROM images
+                 WHERE id NOT IN (SELECT MIN(id) FROM images GROUP BY word_id, image_path)
+            ''')
+            conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_image_word_path ON images(word_id, image_path)')
+
+            # Words WordNet does not know, so they are not looked up again
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS missing_words (
+                    word TEXT PRIMARY KEY,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+        self._pack_legacy_entries()
+
+    def _pack_legacy_entries(self) -> int:
+        """Move rows from the old ``definitions``/``synonyms`` tables into ``senses``.
+
+        Older versions stored one definition and up to five unranked synonyms
+        per word; each becomes a single sense without a part of speech (run
+        ``python -m vocab.prefetch --refresh`` to re-extract full entries).
+        Placeholder definitions are dropped, so those words show up in
+        :meth:`junk_words`.  Returns the number of words packed.
+        """
+        if not self.db.has_table('definitions'):
+            return 0
+        junk = {NO_DEFINITION, ERROR_DEFINITION, ""}
+        legacy = {}
+        with self.db.writer() as conn:
+            for row in conn.execute('SELECT word_id, definition FROM definitions ORDER BY id').fetchall():
+                definition = row['definition']
+                if definition not in junk:
+                    legacy.setdefault(row['word_id'], [definition, []])
+            for row in conn.execute('SELECT word_id, synonym FROM synonyms ORDER BY id').fetchall():
+                legacy.setdefault(row['word_id'], ["", []])[1].append(row['synonym'])
+            conn.executemany('INSERT INTO senses (word_id, data) VALUES (?, ?) ON CONFLICT (word_id) DO NOTHING',
+                             [(word_id, pack_senses([Sense("", definition, (), tuple(dict.fromkeys(synonyms)), ())]))
+                              for word_id, (definition, synonyms) in legacy.items()])
+            conn.execute('DROP TABLE synonyms')
+            conn.execute('DROP TABLE definitions')
+        self.cache.clear()
+        return len(legacy)
+
+    def get_entry(self, word) -> Optional[WordEntry]:
+        """Return the full :class:`WordEntry` for ``word`` or ``None``.
+
+        The word row, its packed senses and images are fetched with a single
+        ``UNION ALL`` query and the result is kept in a bounded cache
+        that the ``insert_*`` methods invalidate.
+        """
+        return self.get_entries([word]).get(word)
+
+    def get_entries(self, words: Iterable[str]) -> Dict[str, WordEntry]:
+        """Return ``word -> WordEntry`` for every stored word in ``words``.
+
+        Cached entries are served from memory, then from the shared cache;
+        the rest are loaded with one ``UNION ALL``/``IN (...)`` query per
+        chunk of words and written back to both caches.
+        """
+        found = {}
+        missing = []
+        for word in dict.fromkeys(words):
+            entry = self.cache.get(word)
+            if entry is not None:
+                found[word] = entry
+            else:
+                missing.append(word)
+
+        if missing and self.shared_cache is not None:
+            shared = self.shared_cache.get_many(self.SHARED_NAMESPACE, missing)
+            still_missing = []
+            for word in missing:
+                cache_result("shared_entries", word in shared)
+                if word in shared:
+                    found[word] = _decode_entry(word, shared[word])
+                    self.cache.put(found[word])
+                else:
+                    still_missing.append(word)
+            missing = still_missing
+
+        if not missing:
+            return found
+        with DB_QUERY_SECONDS.time(method='get_entries'), self.db.reader() as conn:
+            # Every chunk binds its words once per branch of the query
+            for chunk in _chunks(missing, self.MAX_PARAMS // 2):
+                placeholders = ', '.join('?' * len(chunk))
+                rows = conn.execute(f'''
+                    SELECT w.id AS word_id, w.word AS word, 's' AS kind, w.id AS row_id, s.data AS value
+                      FROM words w LEFT JOIN senses s ON s.word_id = w.id WHERE w.word IN ({placeholders})
+                    UNION ALL
+                    SELECT w.id, w.word, 'i', i.id, i.image_path
+                      FROM words w JOIN images i ON i.word_id = w.id WHERE w.word IN ({placeholders})
+                    ORDER BY word_id, kind, row_id
+                ''', chunk * 2).fetchall()
+                for entry in self._entries_from_rows(rows):
+                    self.cache.put(entry)
+                    found[entry.word] = entry
+                    if self.shared_cache is not None:
+                        self.shared_cache.set(self.SHARED_NAMESPACE, entry.word, _encode_entry(entry),
+                                              self.SHARED_TTL)
+        return found
+
+    def _invalidate(self, words):
+        for word in words:
+            self.cache.invalidate(word)
+            if self.shared_cache is not None:
+                self.shared_cache.delete(self.SHARED_NAMESPACE, word)
+
+    def _entries_from_rows(self, rows):
+        grouped = {}
+        for row in rows:
+            word_id = row['word_id']
+            if word_id not in grouped:
+                grouped[word_id] = (row['word'], {'s': [], 'i': []})
+            grouped[word_id][1][row['kind']].append(row['value'])
+        for word_id, (word, buckets) in grouped.items():
+            yield WordEntry(
+                id=word_id,
+                word=word,
+                senses=unpack_senses(buckets['s'][0] if buckets['s'] else None),
+                images=tuple(buckets['i'][:self.MAX_IMAGES]),
             )
-        ''')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_image_word_id ON images(word_id)')
-        
-        self.conn.commit()
 
-    @lru_cache(maxsize=1000)
+    @_timed
     def find_word(self, word):
-        cursor = self.conn.cursor()
-        return cursor.execute('SELECT * FROM words WHERE word = ?', (word,)).fetchone()
+        with self.db.reader() as conn:
+            return conn.execute('SELECT * FROM words WHERE word = ?', (word,)).fetchone()
 
+    @_timed
     def insert_word(self, word):
-        cursor = self.conn.cursor()
-        cursor.execute('INSERT OR IGNORE INTO words (word) VALUES (?)', (word,))
-        self.conn.commit()
-        # Fetch the word ID (either newly inserted or existing)
-        cursor.execute('SELECT id FROM words WHERE word = ?', (word,))
-        result = cursor.fetchone()
+        with self.db.writer() as conn:
+            conn.execute('INSERT INTO words (word) VALUES (?) ON CONFLICT (word) DO NOTHING', (word,))
+            # Fetch the word ID (either newly inserted or existing)
+            result = conn.execute('SELECT id FROM words WHERE word = ?', (word,)).fetchone()
+        self._invalidate([word])
         return result['id'] if result else None
 
-    def insert_definition(self, word_id, definition):
-        cursor = self.conn.cursor()
-        cursor.execute('INSERT INTO definitions (word_id, definition) VALUES (?, ?)',
-                      (word_id, definition))
-        self.conn.commit()
+    @classmethod
+    def _find_words(cls, conn, words) -> Dict[str, int]:
+        found = {}
+        for chunk in _chunks(words, cls.MAX_PARAMS):
+            placeholders = ', '.join('?' * len(chunk))
+            rows = conn.execute(f'SELECT id, word FROM words WHERE word IN ({placeholders})',
+                                chunk).fetchall()
+            found.update((row['word'], row['id']) for row in rows)
+        return found
+
+    @_timed
+    def find_words(self, words: Iterable[str]) -> Dict[str, int]:
+        """Return a ``word -> id`` mapping for the ``words`` that exist."""
+        with self.db.reader() as conn:
+            return self._find_words(conn, list(dict.fromkeys(words)))
+
+    @_timed
+    def words_with_images(self, word_ids: Iterable[int]) -> Set[int]:
+        """Return the subset of ``word_ids`` that already have images."""
+        word_ids = list(word_ids)
+        found = set()
+        with self.db.reader() as conn:
+            for chunk in _chunks(word_ids, self.MAX_PARAMS):
+                placeholders = ', '.join('?' * len(chunk))
+                rows = conn.execute(f'SELECT DISTINCT word_id FROM images WHERE word_id IN ({placeholders})',
+                                    chunk).fetchall()
+                found.update(row['word_id'] for row in rows)
+        return found
 
-    def insert_synonyms(self, word_id, synonyms):
-        cursor = self.conn.cursor()
-        for synonym in synonyms:
-            cursor.execute('INSERT INTO synonyms (word_id, synonym) VALUES (?, ?)',
-                           (word_id, synonym))
-        self.conn.commit()
+    @_timed
+    def insert_entries(self, entries: Iterable[Tuple[str, Sequence[Sense]]]) -> Dict[str, int]:
+        """Store ``(word, senses)`` pairs in a single transaction.
 
+        Each word gets one packed ``senses`` row, replacing any stored
+        before.  Returns the ``word -> id`` mapping of the stored words.
+        """
+        entries = list(dict(entries).items())
+        if not entries:
+            return {}
+        with self.db.writer() as conn:
+            conn.executemany('INSERT INTO words (word) VALUES (?) ON CONFLICT (word) DO NOTHING',
+                             [(word,) for word, _ in entries])
+            ids = self._find_words(conn, [word for word, _ in entries])
+            conn.executemany('INSERT INTO senses (word_id, data) VALUES (?, ?) '
+                             'ON CONFLICT (word_id) DO UPDATE SET data = excluded.data',
+                             [(ids[word], pack_senses(senses)) for word, senses in entries])
+        self._invalidate(word for word, _ in entries)
+        return ids
+
+    @_timed
     def insert_images(self, word_id, images):
-        cursor = self.conn.cursor()
-        for image in images:
-            cursor.execute('INSERT INTO images (word_id, image_path) VALUES (?, ?)',
-                           (word_id, image))
-        self.conn.commit()
-
-    @lru_cache(maxsize=1000)
-    def get_definition(self, word_id):
-        cursor = self.conn.cursor()
-        result = cursor.execute('SELECT definition FROM definitions WHERE word_id = ?',
-                              (word_id,)).fetchone()
-        return result['definition'] if result else ""
-
-    @lru_cache(maxsize=1000)
-    def get_synonyms(self, word_id):
-        cursor = self.conn.cursor()
-        results = cursor.execute('SELECT synonym FROM synonyms WHERE word_id = ?',
-                               (word_id,)).fetchall()
-        return [row['synonym'] for row in results]
-
-    @lru_cache(maxsize=1000)
+        """Add ``images`` to a word, skipping paths it already has."""
+        with self.db.writer() as conn:
+            conn.executemany('INSERT INTO images (word_id, image_path) VALUES (?, ?) '
+                             'ON CONFLICT (word_id, image_path) DO NOTHING',
+                             [(word_id, image) for image in dict.fromkeys(images)])
+            row = conn.execute('SELECT word FROM words WHERE id = ?', (word_id,)).fetchone()
+        self.cache.invalidate_id(word_id)
+        if row is not None:
+            self._invalidate([row['word']])
+
+    @_timed
+    def get_senses(self, word_id) -> Tuple[Sense, ...]:
+        with self.db.reader() as conn:
+            result = conn.execute('SELECT data FROM senses WHERE word_id = ?', (word_id,)).fetchone()
+        return unpack_senses(result['data'] if result else None)
+
+    @_timed
     def get_images(self, word_id):
-        cursor = self.conn.cursor()
-        results = cursor.execute('SELECT image_path FROM images WHERE word_id = ?',
-                                (word_id,)).fetchall()
+        with self.db.reader() as conn:
+            results = conn.execute('SELECT image_path FROM images WHERE word_id = ?',
+                                   (word_id,)).fetchall()
         # Limit to three images to prevent multiple sets from showing
-        return [row['image_path'] for row in results][:3]
+        return [row['image_path'] for row in results][:self.MAX_IMAGES]
+
+    @_timed
+    def mark_missing(self, word, expires_at):
+        with self.db.writer() as conn:
+            conn.execute('INSERT INTO missing_words (word, expires_at) VALUES (?, ?) '
+                         'ON CONFLICT (word) DO UPDATE SET expires_at = excluded.expires_at',
+                         (word, expires_at))
+
+    @_timed
+    def is_missing(self, word, now) -> bool:
+        with self.db.reader() as conn:
+            row = conn.execute('SELECT 1 FROM missing_words WHERE word = ? AND expires_at > ?',
+                               (word, now)).fetchone()
+        return row is not None
+
+    @_timed
+    def missing_words(self, now) -> List[str]:
+        """All words currently recorded as missing."""
+        with self.db.reader() as conn:
+            rows = conn.execute('SELECT word FROM missing_words WHERE expires_at > ?', (now,)).fetchall()
+        return [row['word'] for row in rows]
+
+    @_timed
+    def purge_expired_missing(self, now) -> int:
+        with self.db.writer() as conn:
+            rows = conn.execute('SELECT word FROM missing_words WHERE expires_at <= ?', (now,)).fetchall()
+            conn.execute('DELETE FROM missing_words WHERE expires_at <= ?', (now,))
+        return len(rows)
+
+    @_timed
+    def junk_words(self) -> List[str]:
+        """Words stored without any senses (e.g. old rows holding only a placeholder)."""
+        with self.db.reader() as conn:
+            rows = conn.execute('''
+                SELECT w.word FROM words w
+                 WHERE NOT EXISTS (SELECT 1 FROM senses s WHERE s.word_id = w.id AND s.data <> '[]')
+            ''').fetchall()
+        return [row['word'] for row in rows]
+
+    @_timed
+    def delete_words(self, words: Iterable[str]) -> int:
+        """Delete ``words`` and everything stored for them; return how many existed."""
+        ids = self.find_words(words)
+        if not ids:
+            return 0
+        with self.db.writer() as conn:
+            for chunk in _chunks(list(ids.values()), self.MAX_PARAMS):
+                placeholders = ', '.join('?' * len(chunk))
+                for table in ('images', 'senses'):
+                    conn.execute(f'DELETE FROM {table} WHERE word_id IN ({placeholders})', chunk)
+                conn.execute(f'DELETE FROM words WHERE id IN ({placeholders})', chunk)
+        self._invalidate(ids)
+        return len(ids)
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+# Run from the repository root without installing anything
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def vocab_app(tmp_path, monkeypatch):
+    """An app over a temporary database, image index and word list.
+
+    Shared backends are replaced by in-memory ones, so tests never touch
+    the process-wide defaults.
+    """
+    from app import create_app
+    from model.word import WordRepository
+    from vocab.cache_store import MemoryCache
+    from vocab.image_index import ImageIndex
+    from vocab.runtime_settings import RuntimeSettings
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'wordlist.txt').write_text('dog\ncat\n')
+    database_url = f'sqlite:///{tmp_path / "words.db"}'
+    WordRepository(database_url=database_url).create_tables()
+    app = create_app(home_dir=str(tmp_path / 'images'), database_url=database_url)
+    services = app.extensions['vocab']
+    services.settings = RuntimeSettings(MemoryCache())
+    services.image_index = ImageIndex(str(tmp_path / 'image_index.db'))
+    yield app
+    services.repo.close()
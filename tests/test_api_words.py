@@ -0,0 +1,54 @@
+import pytest
+
+from vocab.lexicon_index import write_index
+from vocab.word_details import Sense, WordDetailsService
+
+DOG = (Sense('n', 'a domesticated canid', (), ('domestic_dog',), ()),)
+
+
+@pytest.fixture
+def client(vocab_app, tmp_path):
+    write_index(str(tmp_path / 'lexicon.idx'), [('dog', DOG), ('cat', DOG)])
+    vocab_app.extensions['vocab'].details = WordDetailsService(str(tmp_path / 'lexicon.idx'))
+    return vocab_app.test_client()
+
+
+def test_get_looks_up_and_stores_words(client, vocab_app):
+    response = client.get('/api/words?w=Dog,zzqx&w=dog')
+    assert response.status_code == 200
+    words = response.get_json()['words']
+    assert list(words) == ['dog', 'zzqx']
+    assert words['zzqx'] is None
+    assert words['dog']['definition'] == 'a domesticated canid'
+    assert words['dog']['synonyms'] == ['domestic_dog']
+    assert words['dog']['images'] == []
+    services = vocab_app.extensions['vocab']
+    assert services.repo.find_word('dog') is not None
+    assert 'zzqx' in services.negative_cache
+
+
+def test_get_answers_conditional_requests(client):
+    first = client.get('/api/words?w=dog')
+    assert first.headers['Cache-Control'] == 'private, max-age=60'
+    again = client.get('/api/words?w=dog', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == first.headers['ETag']
+    assert client.get('/api/words?w=dog,cat', headers={'If-None-Match': first.headers['ETag']}).status_code == 200
+
+
+def test_post_returns_etag_but_is_not_cached(client):
+    etag = client.get('/api/words?w=dog').headers['ETag']
+    response = client.post('/api/words', json={'words': ['dog']}, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == etag
+    assert response.headers['Cache-Control'] == 'no-store'
+
+
+@pytest.mark.parametrize('body', [{'words': 'dog'}, {'words': [1]}, ['dog'], None])
+def test_post_rejects_malformed_bodies(client, body):
+    assert client.post('/api/words', json=body).status_code == 400
+
+
+def test_rejects_oversized_batches(client):
+    words = ','.join(f'w{i}' for i in range(201))
+    assert client.get(f'/api/words?w={words}').status_code == 400
@@ -0,0 +1,87 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import vocab.word_images
+from vocab.image_jobs import DONE, FAILED, ImageJobQueue
+
+
+class FakeDownloader:
+    delay = 0.05
+    searches = []
+
+    def __init__(self, store=None):
+        pass
+
+    async def download_async(self, word, home_dir, on_image=None):
+        self.searches.append(word)
+        if word == 'broken':
+            raise RuntimeError('search failed')
+        images = []
+        for n in range(1, 4):
+            await asyncio.sleep(self.delay)
+            images.append(f'{word}{n}.jpg')
+            on_image(images[-1])
+        return images
+
+
+@pytest.fixture(autouse=True)
+def fake_downloader(monkeypatch):
+    monkeypatch.setattr(vocab.word_images, 'ImageDownloader', FakeDownloader)
+
+
+def _wait(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_job_is_done_only_after_images_are_saved(tmp_path):
+    saved = {}
+
+    def on_complete(job):
+        time.sleep(0.05)
+        saved[job.word] = list(job.images)
+
+    queue = ImageJobQueue(str(tmp_path), workers=1, on_complete=on_complete)
+    job = queue.submit('owl', word_id=1)
+    assert queue.submit('OWL') is job
+    _wait(job)
+    assert job.status == DONE
+    assert saved['owl'] == job.images == ['owl1.jpg', 'owl2.jpg', 'owl3.jpg']
+
+
+def test_failed_download_marks_job_failed(tmp_path):
+    completed = []
+    queue = ImageJobQueue(str(tmp_path), workers=1, on_complete=completed.append)
+    job = _wait(queue.submit('broken'))
+    assert job.status == FAILED
+    assert 'search failed' in job.error
+    assert completed == []
+
+
+def test_finished_jobs_are_pruned(tmp_path):
+    queue = ImageJobQueue(str(tmp_path), workers=1, retain_seconds=0)
+    job = _wait(queue.submit('lark'))
+    assert queue.get('lark') is job
+    time.sleep(0.01)
+    assert queue.submit('lark') is not job
+
+
+def test_concurrent_submits_share_one_download(tmp_path):
+    queue = ImageJobQueue(str(tmp_path), workers=2)
+    with ThreadPoolExecutor(8) as pool:
+        jobs = list(pool.map(lambda _: queue.submit('heron'), range(32)))
+    assert all(job is jobs[0] for job in jobs)
+    job = jobs[0]
+    # Images show up while the job runs
+    deadline = time.monotonic() + 5
+    while not job.images and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert job.images and not job.finished
+    _wait(job)
+    assert job.status == DONE
+    assert FakeDownloader.searches.count('heron') == 1
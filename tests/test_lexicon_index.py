@@ -0,0 +1,56 @@
+import sys
+
+import pytest
+
+from vocab.lexicon_index import LexiconIndex, write_index
+from vocab.word_details import NO_DEFINITION, Sense, WordDetails, WordDetailsService
+
+DOG = (Sense('n', 'a domesticated canid', ('the dog barked',), ('domestic_dog',), ()),)
+RUN = (Sense('v', 'move fast on foot', (), ('sprint',), ('walk',)),
+       Sense('n', 'a score in baseball', (), (), ()))
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / 'lexicon.idx'
+    write_index(str(path), [('dog', DOG), ('run', RUN), ('ice_cream', DOG)])
+    index = LexiconIndex(str(path))
+    yield index
+    index.close()
+
+
+def test_lookup_returns_packed_senses(index):
+    assert len(index) == 3
+    assert index.lookup('dog') == DOG
+    assert index.lookup('Run') == RUN
+    assert index.lookup('ice cream') == DOG
+    assert index.lookup('cat') is None
+
+
+def test_lookup_resolves_inflections(index):
+    assert index.lookup('dogs') == DOG
+    assert index.lookup('runs') == RUN
+
+
+def test_keys_and_membership(index):
+    assert sorted(index.keys()) == ['dog', 'ice_cream', 'run']
+    assert 'dog' in index and 'cat' not in index
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'not-an-index'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        LexiconIndex(str(path))
+
+
+def test_details_service_reads_index_without_nltk(tmp_path):
+    path = tmp_path / 'lexicon.idx'
+    write_index(str(path), [('dog', DOG)])
+    service = WordDetailsService(str(path))
+    try:
+        assert service.get_details('dogs') == WordDetails(DOG[0].definition, DOG)
+        assert service.get_many(['dog', 'cat'])['cat'] == WordDetails(NO_DEFINITION, ())
+    finally:
+        service.index.close()
+    assert 'nltk' not in sys.modules
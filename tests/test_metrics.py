@@ -0,0 +1,75 @@
+import logging
+
+import pytest
+
+from vocab.cache_store import MemoryCache
+from vocab.metrics import REGISTRY, Counter, Gauge, Histogram, Registry
+from vocab.runtime_settings import RuntimeSettings
+
+
+@pytest.fixture(autouse=True)
+def restore_settings():
+    enabled, level = REGISTRY.enabled, logging.getLogger().level
+    yield
+    REGISTRY.enabled = enabled
+    logging.getLogger().setLevel(level)
+
+
+def test_exposition_format():
+    registry = Registry()
+    requests = Counter('app_requests', 'Requests', ['path'], registry=registry)
+    Gauge('app_jobs', 'Jobs', registry=registry).set_function(lambda: 3)
+    latency = Histogram('app_seconds', 'Latency', buckets=(0.1, 1.0), registry=registry)
+    requests.inc(path='/define/"x"/')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    assert registry.render().splitlines() == [
+        '# HELP app_requests Requests',
+        '# TYPE app_requests counter',
+        'app_requests_total{path="/define/\\"x\\"/"} 1',
+        '# HELP app_jobs Jobs',
+        '# TYPE app_jobs gauge',
+        'app_jobs 3',
+        '# HELP app_seconds Latency',
+        '# TYPE app_seconds histogram',
+        'app_seconds_bucket{le="0.1"} 1',
+        'app_seconds_bucket{le="1"} 2',
+        'app_seconds_bucket{le="+Inf"} 2',
+        'app_seconds_sum 0.55',
+        'app_seconds_count 2',
+    ]
+
+
+def test_disabled_registry_records_nothing_but_matches_decrements():
+    registry = Registry()
+    gauge = Gauge('app_in_flight', 'In flight', registry=registry)
+    with gauge.track_inprogress():
+        registry.disable()
+        assert not gauge.inc()
+    assert gauge.value() == 0
+
+
+def test_settings_reach_other_workers():
+    cache = MemoryCache()
+    here, elsewhere = RuntimeSettings(cache), RuntimeSettings(cache, check_interval=0)
+    assert here.update(enabled=False, log_level='debug') == {'enabled': False, 'log_level': 'DEBUG'}
+    REGISTRY.enable()
+    logging.getLogger().setLevel(logging.WARNING)
+    elsewhere.refresh()
+    assert not REGISTRY.enabled
+    assert logging.getLogger().level == logging.DEBUG
+    with pytest.raises(ValueError):
+        here.update(log_level='LOUD')
+
+
+def test_metrics_endpoint(vocab_app, monkeypatch):
+    monkeypatch.setenv('METRICS_TOKEN', 'secret')
+    client = vocab_app.test_client()
+    response = client.get('/metrics')
+    assert response.mimetype == 'text/plain'
+    assert '# TYPE vocab_request_seconds histogram' in response.get_data(as_text=True)
+    assert client.post('/metrics', data={'enabled': '0'}).status_code == 403
+    auth = {'Authorization': 'Bearer secret'}
+    assert client.post('/metrics', data={'log_level': 'LOUD'}, headers=auth).status_code == 400
+    assert client.post('/metrics', data={'enabled': '0'}, headers=auth).get_json()['enabled'] is False
+    assert client.get('/metrics').status_code == 404
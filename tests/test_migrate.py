@@ -0,0 +1,81 @@
+import sqlite3
+
+import pytest
+
+from model.migrate import migrate
+from model.word import WordRepository
+from vocab.word_details import NO_DEFINITION, Sense
+
+
+def _legacy_database(path):
+    """A database as written before senses were packed into one row."""
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE words (id INTEGER PRIMARY KEY AUTOINCREMENT, word TEXT UNIQUE NOT NULL);
+        CREATE TABLE definitions (id INTEGER PRIMARY KEY AUTOINCREMENT, word_id INTEGER NOT NULL,
+                                  definition TEXT NOT NULL);
+        CREATE TABLE synonyms (id INTEGER PRIMARY KEY AUTOINCREMENT, word_id INTEGER NOT NULL,
+                               synonym TEXT NOT NULL);
+        CREATE TABLE images (id INTEGER PRIMARY KEY AUTOINCREMENT, word_id INTEGER NOT NULL,
+                             image_path TEXT NOT NULL);
+    ''')
+    conn.executemany('INSERT INTO words (id, word) VALUES (?, ?)',
+                     [(1, 'dog'), (2, 'zzyzx'), (3, 'cat'), (4, 'bare')])
+    conn.executemany('INSERT INTO definitions (word_id, definition) VALUES (?, ?)',
+                     [(1, 'a domesticated canid'), (1, 'a second, ignored definition'),
+                      (2, NO_DEFINITION), (3, 'a small feline')])
+    conn.executemany('INSERT INTO synonyms (word_id, synonym) VALUES (?, ?)',
+                     [(1, 'domestic_dog'), (1, 'domestic_dog'), (1, 'Canis_familiaris'), (2, 'zz')])
+    # Older versions could store the same image twice
+    conn.executemany('INSERT INTO images (word_id, image_path) VALUES (?, ?)',
+                     [(1, 'dog1.jpg'), (1, 'dog2.jpg'), (1, 'dog1.jpg')])
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def legacy_url(tmp_path):
+    path = tmp_path / 'legacy.db'
+    _legacy_database(path)
+    return f'sqlite:///{path}'
+
+
+def test_migrate_packs_legacy_rows(legacy_url):
+    migrate(legacy_url)
+    repo = WordRepository(database_url=legacy_url)
+    try:
+        entries = repo.get_entries(['dog', 'zzyzx', 'cat', 'bare'])
+        assert entries['dog'].senses == (
+            Sense('', 'a domesticated canid', (), ('domestic_dog', 'Canis_familiaris'), ()),)
+        assert entries['dog'].images == ('dog1.jpg', 'dog2.jpg')
+        assert entries['cat'].senses == (Sense('', 'a small feline', (), (), ()),)
+        # Placeholder definitions are dropped; only synonyms survive
+        assert entries['zzyzx'].definition == ''
+        assert entries['bare'].senses == ()
+        assert sorted(repo.junk_words()) == ['bare']
+        assert not repo.db.has_table('definitions')
+        assert not repo.db.has_table('synonyms')
+    finally:
+        repo.close()
+
+
+def test_migrate_is_idempotent(legacy_url):
+    migrate(legacy_url)
+    migrate(legacy_url)
+    repo = WordRepository(database_url=legacy_url)
+    try:
+        assert repo.get_entry('dog').synonyms == ['domestic_dog', 'Canis_familiaris']
+    finally:
+        repo.close()
+
+
+def test_images_are_unique_per_word(legacy_url):
+    migrate(legacy_url)
+    repo = WordRepository(database_url=legacy_url)
+    try:
+        repo.insert_images(1, ['dog2.jpg', 'dog3.jpg', 'dog3.jpg'])
+        assert repo.get_images(1) == ['dog1.jpg', 'dog2.jpg', 'dog3.jpg']
+        with pytest.raises(sqlite3.IntegrityError), repo.db.writer() as conn:
+            conn.execute("INSERT INTO images (word_id, image_path) VALUES (1, 'dog1.jpg')")
+    finally:
+        repo.close()
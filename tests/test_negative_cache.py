@@ -0,0 +1,66 @@
+import time
+
+from model.word import WordRepository
+from vocab.negative_cache import BloomFilter, NegativeCache, cleanup
+from vocab.word_details import Sense
+
+
+class FakeRepo:
+    def __init__(self, missing=()):
+        self.missing = {word: float('inf') for word in missing}
+        self.queries = 0
+
+    def missing_words(self, now):
+        return [word for word, expires in self.missing.items() if expires > now]
+
+    def is_missing(self, word, now):
+        self.queries += 1
+        return self.missing.get(word, 0) > now
+
+    def mark_missing(self, word, expires_at):
+        self.missing[word] = expires_at
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000)
+    words = [f'word{i}' for i in range(1000)]
+    for word in words:
+        bloom.add(word)
+    assert all(word in bloom for word in words)
+    false_positives = sum(f'other{i}' in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_negative_cache_skips_database_for_unknown_words():
+    repo = FakeRepo(['zzyzx'])
+    cache = NegativeCache(repo)
+    assert 'ZZYZX' in cache
+    assert repo.queries == 1
+    assert not any(f'word{i}' in cache for i in range(100))
+    # Only Bloom false positives reach the database
+    assert repo.queries < 10
+
+
+def test_negative_cache_rebuilds_when_full():
+    repo = FakeRepo()
+    cache = NegativeCache(repo, capacity=4)
+    for i in range(10):
+        cache.add(f'typo{i}')
+    assert all(f'typo{i}' in cache for i in range(10))
+    assert cache._filter.capacity >= 8
+
+
+def test_cleanup_removes_junk_rows_and_expired_words(tmp_path):
+    repo = WordRepository(database_url=f'sqlite:///{tmp_path / "words.db"}')
+    repo.create_tables()
+    try:
+        repo.insert_entries([('dog', [Sense('n', 'a canid', (), (), ())]), ('qwzx', [])])
+        repo.insert_word('zzyzx')
+        repo.mark_missing('old', time.time() - 1)
+        cache = NegativeCache(repo, ttl=60)
+        cache.add('blargh')
+        assert cleanup(repo) == (2, 1)
+        assert repo.find_words(['dog', 'qwzx', 'zzyzx']) == {'dog': repo.find_word('dog')['id']}
+        assert 'blargh' in cache and 'old' not in cache
+    finally:
+        repo.close()
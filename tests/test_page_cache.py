@@ -0,0 +1,59 @@
+import pytest
+
+from vocab.lexicon_index import write_index
+from vocab.page_cache import PageCache, content_version
+from vocab.word_details import Sense, WordDetailsService
+
+DOG = (Sense('n', 'a domesticated canid', (), ('domestic_dog',), ()),)
+
+
+def test_memory_pages_are_bounded():
+    cache = PageCache(maxsize=2)
+    for version in 'abc':
+        cache.put(version, version.encode())
+    assert len(cache) == 2
+    assert cache.get('a') is None
+    assert cache.get('c').body == b'c'
+
+
+def test_disk_pages_are_shared_and_pruned(tmp_path):
+    cache = PageCache(directory=str(tmp_path), max_disk_pages=10)
+    cache.put('secret', b'?original=', persist=False)
+    versions = [content_version('word', i) for i in range(11)]
+    for version in versions:
+        cache.put(version, version.encode())
+    other = PageCache(directory=str(tmp_path))
+    assert other.get('secret') is None
+    assert len(list(tmp_path.glob('*/*.html'))) == 9
+    kept = [v for v in versions if other.get(v) is not None]
+    assert len(kept) == 9
+    assert other.get(kept[0]).etag == kept[0]
+
+
+@pytest.fixture
+def client(vocab_app, tmp_path):
+    write_index(str(tmp_path / 'lexicon.idx'), [('dog', DOG)])
+    vocab_app.extensions['vocab'].details = WordDetailsService(str(tmp_path / 'lexicon.idx'))
+    return vocab_app.test_client()
+
+
+def test_word_page_answers_conditional_requests(client):
+    first = client.get('/define/dog/')
+    assert first.status_code == 200
+    assert b'a domesticated canid' in first.data
+    assert first.headers['Cache-Control'] == 'public, max-age=3600'
+    assert 'Last-Modified' in first.headers
+    etag = first.headers['ETag']
+    assert client.get('/define/dog/', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/define/dog/', headers={'If-Modified-Since': first.headers['Last-Modified']}).status_code == 304
+    # Another variant of the page has its own ETag
+    assert client.get('/define/dog/?original=Dogs').headers['ETag'] != etag
+
+
+def test_word_page_changes_with_entry(client, vocab_app):
+    etag = client.get('/define/dog/').headers['ETag']
+    repo = vocab_app.extensions['vocab'].repo
+    repo.insert_entries([('dog', [DOG[0]._replace(definition='a loyal companion')])])
+    response = client.get('/define/dog/', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert b'a loyal companion' in response.data
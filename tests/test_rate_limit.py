@@ -0,0 +1,64 @@
+from vocab import rate_limit
+from vocab.metrics import RATELIMIT_THROTTLED
+from vocab.rate_limit import SEARCH_HOST, RateLimiter, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_reserve_spends_burst_then_waits(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', clock)
+    bucket = TokenBucket(rate=2.0, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+    clock.now += 1.0
+    assert bucket.reserve() == 0.5
+
+
+def test_reserve_counts_throttled_requests(monkeypatch):
+    monkeypatch.setattr(rate_limit.time, 'monotonic', Clock())
+    bucket = TokenBucket(rate=1.0, burst=1, kind='search')
+    before = RATELIMIT_THROTTLED.value(kind='search')
+    bucket.reserve()
+    bucket.reserve()
+    assert RATELIMIT_THROTTLED.value(kind='search') == before + 1
+
+
+def test_penalize_pushes_next_token_back(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', clock)
+    bucket = TokenBucket(rate=2.0, burst=4)
+    bucket.penalize(10)
+    assert bucket.reserve() == 10.5
+    clock.now += 20
+    assert bucket.reserve() == 0
+
+
+def test_limiter_shares_buckets_per_host():
+    limiter = RateLimiter()
+    assert limiter.bucket('https://example.com/a.jpg') is limiter.bucket('example.com')
+    assert limiter.bucket(SEARCH_HOST).kind == 'search'
+    assert limiter.bucket('example.com').kind == 'image'
+    assert limiter.bucket(SEARCH_HOST).rate == rate_limit.SEARCH_RATE
+
+
+def test_limiter_evicts_settled_buckets(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', clock)
+    limiter = RateLimiter()
+    limiter.max_buckets = 4
+    busy = limiter.bucket('busy.example')
+    busy.reserve()
+    for i in range(10):
+        limiter.bucket(f'host{i}.example')
+    assert len(limiter._buckets) <= 4
+    # A bucket still refilling keeps its debt
+    assert limiter.bucket('busy.example') is busy
@@ -0,0 +1,87 @@
+import random
+import time
+from collections import Counter
+
+import pytest
+
+from vocab.sampling import AliasTable, FeistelPermutation, shuffle_step
+from vocab.utils import WordPicker
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 10, 257, 1000])
+def test_feistel_permutation_is_a_bijection(size):
+    permutation = FeistelPermutation(size, seed=12345)
+    assert sorted(permutation.index(i) for i in range(size)) == list(range(size))
+
+
+def test_feistel_permutation_depends_on_seed():
+    first = [FeistelPermutation(100, 1).index(i) for i in range(100)]
+    second = [FeistelPermutation(100, 2).index(i) for i in range(100)]
+    assert first != second
+
+
+def test_shuffle_visits_every_index_before_repeating():
+    seed, position, seen = 7, 0, []
+    for _ in range(50):
+        index, seed, position = shuffle_step(50, seed, position)
+        seen.append(index)
+    assert sorted(seen) == list(range(50))
+    # The next pass starts with a new seed
+    _, new_seed, position = shuffle_step(50, seed, position)
+    assert position == 1 and new_seed != seed
+
+
+def test_alias_table_follows_weights():
+    table = AliasTable([1, 0, 3])
+    rng = random.Random(0)
+    counts = Counter(table.sample(rng) for _ in range(20000))
+    assert counts[1] == 0
+    assert counts[2] / counts[0] == pytest.approx(3, rel=0.1)
+
+
+@pytest.mark.parametrize('weights', [[], [0, 0], [1, -1]])
+def test_alias_table_rejects_invalid_weights(weights):
+    with pytest.raises(ValueError):
+        AliasTable(weights)
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_picker_rebuilds_weights_after_invalidation(tmp_path):
+    word_file = tmp_path / 'wordlist.txt'
+    word_file.write_text('stored\nnew\n')
+    unstored = {'new'}
+    picker = WordPicker(str(word_file), reload_interval=0,
+                        weight_fn=lambda words: [1.0 if w in unstored else 0.0 for w in words])
+    assert {picker.pick() for _ in range(50)} == {'new'}
+    unstored.clear()
+    unstored.add('stored')
+    # Stale weights are kept until invalidated
+    assert {picker.pick() for _ in range(50)} == {'new'}
+    picker.invalidate_weights()
+    assert _wait_for(lambda: picker.pick() == 'stored' and picker.pick() == 'stored')
+
+
+def test_picker_weights_expire(tmp_path):
+    word_file = tmp_path / 'wordlist.txt'
+    word_file.write_text('a\nb\n')
+    calls = []
+    picker = WordPicker(str(word_file), reload_interval=0, weights_max_age=0,
+                        weight_fn=lambda words: calls.append(words) or [1.0, 1.0])
+    assert _wait_for(lambda: picker.pick() and len(calls) > 1)
+
+
+def test_pick_next_walks_the_whole_list(tmp_path):
+    word_file = tmp_path / 'wordlist.txt'
+    word_file.write_text('\n'.join(f'w{i}' for i in range(20)))
+    picker = WordPicker(str(word_file))
+    state, seen = None, []
+    for _ in range(20):
+        word, state = picker.pick_next(state)
+        seen.append(word)
+    assert sorted(seen) == sorted(f'w{i}' for i in range(20))
@@ -0,0 +1,68 @@
+import threading
+import time
+
+from vocab import search_index
+from vocab.search_index import Suggester
+
+
+def test_word_list_changes_rebuild_once_in_background(monkeypatch):
+    builds = []
+
+    class SlowIndex(search_index.SearchIndex):
+        def __init__(self, words, **kwargs):
+            builds.append(list(words))
+            time.sleep(0.1)
+            super().__init__(builds[-1], **kwargs)
+
+    words, version = ['alpha', 'beta'], [1]
+    suggester = Suggester(lambda: list(words), lambda: version[0])
+    monkeypatch.setattr(search_index, 'SearchIndex', SlowIndex)
+    words.append('gamma')
+    version[0] = 2
+
+    threads = [threading.Thread(target=suggester.complete, args=('g',)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Requests keep the old index while the single rebuild runs
+    assert suggester.complete('g') == []
+    deadline = time.monotonic() + 5
+    while suggester.complete('g') == [] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert suggester.complete('g') == ['gamma']
+    assert len(builds) == 1
+
+
+def _blocked_lemmas(release):
+    def source():
+        release.wait(5)
+        return ['abandon', 'abate']
+    return source
+
+
+def test_ready_once_lemmas_are_indexed():
+    release = threading.Event()
+    suggester = Suggester(lambda: ['abacus'], lemma_source=_blocked_lemmas(release))
+    assert not suggester.ready
+    assert suggester.complete('aba') == ['abacus']
+    release.set()
+    deadline = time.monotonic() + 5
+    while not suggester.ready and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert suggester.complete('aba') == ['abacus', 'abandon', 'abate']
+
+
+def test_suggest_endpoint_is_not_cached_until_ready(vocab_app):
+    release = threading.Event()
+    suggester = Suggester(lambda: ['abacus'], lemma_source=_blocked_lemmas(release))
+    vocab_app.extensions['vocab'].search_index = suggester
+    client = vocab_app.test_client()
+    response = client.get('/api/suggest?q=aba')
+    assert response.get_json()['completions'] == ['abacus']
+    assert response.headers['Cache-Control'] == 'no-store'
+    release.set()
+    deadline = time.monotonic() + 5
+    while not suggester.ready and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client.get('/api/suggest?q=aba').headers['Cache-Control'] == 'public, max-age=3600'
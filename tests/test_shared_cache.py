@@ -0,0 +1,74 @@
+import pytest
+
+from model.word import WordEntry, WordRepository
+from vocab.cache_store import MemoryCache, PersistentCache, cache_from_url
+from vocab.image_store import LocalImageStore, S3ImageStore
+from vocab.word_details import Sense
+
+SENSE = Sense('n', 'a bird of prey', (), ('hooter',), ())
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = WordRepository(database_url=f'sqlite:///{tmp_path / "words.db"}', shared_cache=MemoryCache())
+    repo.create_tables()
+    yield repo
+    repo.close()
+
+
+def test_shared_cache_serves_other_processes(repo, tmp_path):
+    repo.insert_entries([('owl', [SENSE])])
+    repo.get_entry('owl')
+    # A second repository sharing the cache never needs the database for it
+    other = WordRepository(database_url=f'sqlite:///{tmp_path / "empty.db"}', shared_cache=repo.shared_cache)
+    try:
+        assert other.get_entry('owl') == repo.get_entry('owl')
+        repo.delete_words(['owl'])
+        assert other.shared_cache.get('entries', 'owl') is None
+    finally:
+        other.close()
+
+
+def test_shared_entries_round_trip_senses(repo):
+    word_id = repo.insert_entries([('owl', [SENSE])])['owl']
+    repo.insert_images(word_id, ['owl1.jpg'])
+    repo.get_entry('owl')
+    repo.cache.clear()
+    assert repo.get_entry('owl') == WordEntry(word_id, 'owl', (SENSE,), ('owl1.jpg',))
+
+
+def test_cache_from_url(tmp_path):
+    assert isinstance(cache_from_url('memory://'), MemoryCache)
+    cache = cache_from_url(f'sqlite:///{tmp_path / "cache.db"}')
+    assert isinstance(cache, PersistentCache)
+    cache.set('search', 'owl', ['a.jpg'])
+    assert PersistentCache(str(tmp_path / 'cache.db')).get('search', 'owl') == ['a.jpg']
+    with pytest.raises(ValueError):
+        cache_from_url('ftp://cache')
+
+
+def test_local_image_store_publishes_files(tmp_path):
+    source = tmp_path / 'download.jpg'
+    source.write_bytes(b'jpeg')
+    store = LocalImageStore(str(tmp_path / 'images'), base_url='https://cdn.example/')
+    store.save('cas/ab/abc-320.jpg', source)
+    assert store.exists('cas/ab/abc-320.jpg')
+    assert store.url('cas/ab/abc-320.jpg') == 'https://cdn.example/cas/ab/abc-320.jpg'
+    store.delete('cas/ab/abc-320.jpg')
+    assert not store.exists('cas/ab/abc-320.jpg')
+
+
+class FakeS3:
+    def __init__(self):
+        self.uploads = []
+
+    def upload_file(self, path, bucket, key, ExtraArgs):
+        self.uploads.append((bucket, key, ExtraArgs['ContentType']))
+
+
+def test_s3_image_store_prefixes_keys(tmp_path):
+    client = FakeS3()
+    store = S3ImageStore('words', '/images/', client=client)
+    store.save('owl1.jpg', tmp_path / 'owl1.jpg')
+    assert client.uploads == [('words', 'images/owl1.jpg', 'image/jpeg')]
+    assert store.url('owl1.jpg') == 'https://words.s3.amazonaws.com/images/owl1.jpg'
@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('nltk', 'PIL', 'aiohttp', 'peewee', 'redis', 'boto3', 'vocab.word_images', 'vocab.lexicon_index')
+
+WORKER = """
+import json, os, sys
+from app import app
+report = {"imported": [m for m in %r if m in sys.modules],
+          "services": sorted(app.extensions['vocab'].__dict__),
+          "files": os.listdir('.')}
+report["index_status"] = app.test_client().get('/').status_code
+report["after_index"] = [m for m in %r if m in sys.modules]
+print(json.dumps(report))
+""" % (HEAVY, HEAVY)
+
+
+def test_import_and_first_page_stay_lazy(tmp_path):
+    env = dict(os.environ, PYTHONPATH=ROOT, ENVIRONMENT='local')
+    env.pop('DATABASE_URL', None)
+    output = subprocess.run([sys.executable, '-c', WORKER], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    report = json.loads(output.splitlines()[-1])
+    assert report['imported'] == []
+    # Only configuration; every collaborator is created on first use
+    assert report['services'] == ['database_url', 'home_dir']
+    # Importing touched neither the database nor any cache
+    assert report['files'] == []
+    assert report['index_status'] == 200
+    assert report['after_index'] == []
+    # The first request only reads the shared runtime settings
+    assert os.listdir(tmp_path) == ['cache.db']
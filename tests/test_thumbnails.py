@@ -0,0 +1,49 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('PIL')
+from PIL import Image  # noqa: E402
+
+from vocab.image_index import ImageIndex  # noqa: E402
+from vocab.thumbnails import CAS_DIR, ThumbnailPipeline, generate  # noqa: E402
+
+
+def _image(path, size=(800, 400), color='red'):
+    Image.new('RGB', size, color).save(path, 'PNG')
+    return path
+
+
+def test_thumbnails_are_content_addressed(tmp_path):
+    first = generate(str(_image(tmp_path / 'owl1.png')), str(tmp_path), widths=(160, 320))
+    second = generate(str(_image(tmp_path / 'bird1.png')), str(tmp_path), widths=(160, 320))
+    assert first == second
+    for width, path in first.paths.items():
+        assert Path(path).parts[:2] == (CAS_DIR, first.sha256[:2])
+        assert Path(path).name.startswith(f'{first.sha256}-{width}.')
+        with Image.open(tmp_path / path) as thumbnail:
+            assert thumbnail.size == (width, width // 2)
+
+
+def test_small_images_are_not_upscaled(tmp_path):
+    result = generate(str(_image(tmp_path / 'tiny1.png', (100, 50))), str(tmp_path), widths=(320,))
+    with Image.open(tmp_path / result.paths[320]) as thumbnail:
+        assert thumbnail.size == (100, 50)
+
+
+def test_unreadable_files_are_skipped(tmp_path):
+    (tmp_path / 'junk1.png').write_bytes(b'not an image')
+    assert generate(str(tmp_path / 'junk1.png'), str(tmp_path)) is None
+
+
+def test_pipeline_indexes_thumbnails(tmp_path):
+    index = ImageIndex(str(tmp_path / 'index.db'))
+    index.add_file('owl', _image(tmp_path / 'owl1.png'))
+    pipeline = ThumbnailPipeline(str(tmp_path), index, workers=1)
+    try:
+        created = asyncio.run(pipeline.process(['owl1.png', 'missing1.png']))
+    finally:
+        pipeline.close()
+    assert list(created) == ['owl1.png']
+    assert index.thumbnails_for(['owl1.png'])['owl1.png'] == created['owl1.png'].paths
@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+
+from vocab.cache_store import MemoryCache
+from vocab.image_index import ImageIndex
+from vocab.image_store import LocalImageStore
+from vocab.rate_limit import RateLimiter
+from vocab.word_images import ImageDownloader, ImageTooLarge
+
+
+class FakeContent:
+    def __init__(self, chunks, stall=False):
+        self.chunks = chunks
+        self.stall = stall
+
+    async def iter_chunked(self, size):
+        for chunk in self.chunks:
+            yield chunk
+        if self.stall:
+            await asyncio.sleep(3600)
+
+
+class FakeResponse:
+    def __init__(self, chunks, content_type='image/jpeg', content_length=None, stall=False):
+        self.status = 200
+        self.headers = {'Content-Type': content_type}
+        self.content_length = content_length
+        self.content = FakeContent(chunks, stall)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.requests = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests += 1
+        return self.response
+
+
+@pytest.fixture
+def downloader(tmp_path):
+    downloader = ImageDownloader(cache=MemoryCache(), index=ImageIndex(str(tmp_path / 'index.db')),
+                                 limiter=RateLimiter(default_rate=1000, default_burst=1000),
+                                 max_image_bytes=100, store=LocalImageStore(str(tmp_path)))
+    downloader._current_keyword = 'owl'
+    downloader._current_store = downloader.store
+    return downloader
+
+
+def _leftovers(tmp_path, timeout=5):
+    # Partial files are removed on the file executor, after any write in flight
+    deadline = time.monotonic() + timeout
+    while list(tmp_path.glob('*.part')) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return list(tmp_path.glob('*.part'))
+
+
+def test_download_streams_into_place(downloader, tmp_path):
+    session = FakeSession(FakeResponse([b'a' * 40, b'b' * 40]))
+    name = asyncio.run(downloader._download_image(session, 'https://img.example/owl.jpg', tmp_path / 'owl1.jpg'))
+    assert name == 'owl1.jpg'
+    assert (tmp_path / 'owl1.jpg').read_bytes() == b'a' * 40 + b'b' * 40
+    assert [f.filename for f in downloader.index.files_for('owl')] == ['owl1.jpg']
+
+
+@pytest.mark.parametrize('response', [
+    FakeResponse([b'<html>'], content_type='text/html'),
+    FakeResponse([b'x'], content_length=101),
+    FakeResponse([b'x' * 60, b'x' * 60]),
+])
+def test_download_rejects_wrong_type_and_size(downloader, tmp_path, response):
+    session = FakeSession(response)
+    assert asyncio.run(downloader._download_image(session, 'https://img.example/a', tmp_path / 'owl1.jpg')) is None
+    assert session.requests == 1
+    assert not (tmp_path / 'owl1.jpg').exists()
+    assert _leftovers(tmp_path) == []
+
+
+def test_oversized_stream_removes_partial_file(downloader, tmp_path):
+    with pytest.raises(ImageTooLarge):
+        asyncio.run(downloader._stream_to_file(FakeResponse([b'x' * 60, b'x' * 60]), tmp_path / 'owl1.jpg'))
+    assert _leftovers(tmp_path) == []
+
+
+def test_cancelled_stream_removes_partial_file(downloader, tmp_path):
+    async def cancel_midway():
+        task = asyncio.ensure_future(
+            downloader._stream_to_file(FakeResponse([b'x' * 10], stall=True), tmp_path / 'owl1.jpg'))
+        while not list(tmp_path.glob('*.part')):
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_midway())
+    assert _leftovers(tmp_path) == []
+    assert not (tmp_path / 'owl1.jpg').exists()
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from model.word import EntryCache, WordEntry, WordRepository
+from vocab.word_details import Sense
+
+SENSE = Sense('n', 'a word', ('an example',), ('term',), ())
+
+
+def _entry(word_id, word):
+    return WordEntry(word_id, word, (SENSE,), ())
+
+
+def test_entry_cache_evicts_least_recently_used():
+    cache = EntryCache(maxsize=2)
+    cache.put(_entry(1, 'a'))
+    cache.put(_entry(2, 'b'))
+    cache.get('a')
+    cache.put(_entry(3, 'c'))
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+
+
+def test_entry_cache_invalidates_by_word_and_id():
+    cache = EntryCache()
+    cache.put(_entry(1, 'a'))
+    cache.put(_entry(2, 'b'))
+    cache.invalidate('a')
+    cache.invalidate_id(2)
+    assert cache.get('a') is None
+    assert cache.get('b') is None
+
+
+def test_entry_cache_expires_entries():
+    cache = EntryCache(ttl=0.01)
+    cache.put(_entry(1, 'a'))
+    time.sleep(0.02)
+    assert cache.get('a') is None
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = WordRepository(database_url=f'sqlite:///{tmp_path / "words.db"}')
+    repo.create_tables()
+    yield repo
+    repo.close()
+
+
+class NoDatabase:
+    def reader(self):
+        raise AssertionError('entry should have come from the cache')
+
+
+def test_get_entries_loads_words_once(repo):
+    ids = repo.insert_entries([('dog', [SENSE]), ('cat', [SENSE])])
+    repo.insert_images(ids['dog'], [f'dog{i}.jpg' for i in range(5)])
+    entries = repo.get_entries(['dog', 'cat', 'dog', 'unknown'])
+    assert set(entries) == {'dog', 'cat'}
+    assert entries['dog'].senses == (SENSE,)
+    assert entries['dog'].images == ('dog0.jpg', 'dog1.jpg', 'dog2.jpg')
+    assert entries['cat'].images == ()
+    db, repo.db = repo.db, NoDatabase()
+    try:
+        assert repo.get_entries(['cat', 'dog']) == {'cat': entries['cat'], 'dog': entries['dog']}
+    finally:
+        repo.db = db
+
+
+def test_writes_invalidate_cached_entries(repo):
+    ids = repo.insert_entries([('dog', [SENSE])])
+    assert repo.get_entry('dog').images == ()
+    repo.insert_images(ids['dog'], ['dog1.jpg', 'dog2.jpg'])
+    assert repo.get_entry('dog').images == ('dog1.jpg', 'dog2.jpg')
+    repo.insert_entries([('dog', [SENSE._replace(definition='a canid')])])
+    assert repo.get_entry('dog').definition == 'a canid'
+    repo.delete_words(['dog'])
+    assert repo.get_entry('dog') is None
+
+
+def test_insert_images_skips_stored_paths(repo):
+    word_id = repo.insert_entries([('cat', [SENSE])])['cat']
+    repo.insert_images(word_id, ['cat1.jpg'])
+    repo.insert_images(word_id, ['cat1.jpg', 'cat2.jpg', 'cat2.jpg'])
+    assert repo.get_images(word_id) == ['cat1.jpg', 'cat2.jpg']
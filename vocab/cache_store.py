@@ -0,0 +1,238 @@
+"""Key/value cache for work that every worker should reuse.
+
+All backends store JSON values under ``(namespace, key)`` with a TTL and
+share the ``get``/``get_many``/``set``/``delete`` interface:
+
+* :class:`PersistentCache` -- a small SQLite database shared by the worker
+  processes of one machine (``cache.db`` by default, ``VOCAB_CACHE_DB``).
+* :class:`RedisCache` -- shared by every node; needs the ``redis`` package.
+* :class:`MemoryCache` -- in-process, for tests and single-process runs.
+
+``VOCAB_CACHE_URL`` (``redis://...``, ``memory://`` or ``sqlite:///path``)
+selects the backend of :func:`default_cache`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+DEFAULT_PATH = "cache.db"
+DEFAULT_TTL = 30 * 24 * 3600
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_key(key: str) -> str:
+    """Normalize a search keyword so equivalent spellings share a cache entry."""
+    return " ".join(key.lower().split())
+
+
+class PersistentCache:
+    """TTL + size bounded JSON cache in SQLite, safe across threads and processes."""
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl: float = DEFAULT_TTL,
+                 max_entries: int = 50000) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_stored_at ON cache(namespace, stored_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode = wal")
+            conn.execute("PRAGMA synchronous = normal")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return the cached value or ``None`` if missing or expired."""
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, normalize_key(key), time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, namespace: str, keys: list[str]) -> dict[str, Any]:
+        """Return ``key -> value`` for the ``keys`` that are cached."""
+        normalized = {normalize_key(key): key for key in keys}
+        found = {}
+        names = list(normalized)
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            rows = self._connection().execute(
+                f"SELECT key, value FROM cache WHERE namespace = ? AND key IN ({', '.join('?' * len(chunk))}) "
+                "AND expires_at > ?",
+                (namespace, *chunk, time.time()),
+            ).fetchall()
+            found.update((normalized[key], json.loads(value)) for key, value in rows)
+        return found
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, stored_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, normalize_key(key), json.dumps(value), now, expires_at),
+            )
+            self._evict(conn, namespace, now)
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?",
+                         (namespace, normalize_key(key)))
+
+    def _evict(self, conn: sqlite3.Connection, namespace: str, now: float) -> None:
+        conn.execute("DELETE FROM cache WHERE namespace = ? AND expires_at <= ?", (namespace, now))
+        conn.execute("""
+            DELETE FROM cache WHERE namespace = ? AND key IN (
+                SELECT key FROM cache WHERE namespace = ?
+                ORDER BY stored_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (namespace, namespace, self.max_entries))
+
+
+class MemoryCache:
+    """In-process cache with the same semantics as :class:`PersistentCache`."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = 50000) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._namespaces: dict[str, OrderedDict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._namespaces.get(namespace, {}).get(normalize_key(key))
+        if item is None or item[1] <= time.time():
+            return None
+        # Stored as JSON so callers never share mutable values
+        return json.loads(item[0])
+
+    def get_many(self, namespace: str, keys: list[str]) -> dict[str, Any]:
+        found = {}
+        for key in keys:
+            value = self.get(namespace, key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            entries = self._namespaces.setdefault(namespace, OrderedDict())
+            key = normalize_key(key)
+            entries[key] = (json.dumps(value), expires_at)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._namespaces.get(namespace, {}).pop(normalize_key(key), None)
+
+
+class RedisCache:
+    """Cache shared by every node through Redis.
+
+    Size is bounded by the server's ``maxmemory`` policy rather than per
+    namespace.  An unreachable server is logged and treated as a miss, so
+    requests keep working without the shared tier.
+    """
+
+    def __init__(self, url: str, ttl: float = DEFAULT_TTL, prefix: str = "vocab", client=None) -> None:
+        import redis
+
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = client if client is not None else redis.Redis.from_url(url)
+        self._errors = redis.RedisError
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{normalize_key(key)}"
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        try:
+            value = self._client.get(self._key(namespace, key))
+        except self._errors as exc:
+            logger.warning("Cache read failed: %s", exc)
+            return None
+        return json.loads(value) if value is not None else None
+
+    def get_many(self, namespace: str, keys: list[str]) -> dict[str, Any]:
+        if not keys:
+            return {}
+        try:
+            values = self._client.mget([self._key(namespace, key) for key in keys])
+        except self._errors as exc:
+            logger.warning("Cache read failed: %s", exc)
+            return {}
+        return {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            self._client.set(self._key(namespace, key), json.dumps(value),
+                             ex=max(1, int(self.ttl if ttl is None else ttl)))
+        except self._errors as exc:
+            logger.warning("Cache write failed: %s", exc)
+
+    def delete(self, namespace: str, key: str) -> None:
+        try:
+            self._client.delete(self._key(namespace, key))
+        except self._errors as exc:
+            logger.warning("Cache delete failed: %s", exc)
+
+
+def cache_from_url(url: str):
+    """Return the cache backend for ``url`` (see the module docstring)."""
+    parsed = urlparse(url)
+    if parsed.scheme in ("redis", "rediss", "unix"):
+        return RedisCache(url)
+    if parsed.scheme == "memory":
+        return MemoryCache()
+    if parsed.scheme == "sqlite":
+        return PersistentCache(parsed.path[1:] if parsed.path.startswith("/") else parsed.path)
+    raise ValueError(f"unsupported cache URL {url!r}")
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """Return the process-wide cache.
+
+    ``VOCAB_CACHE_URL`` if set, otherwise SQLite at ``VOCAB_CACHE_DB``
+    (default ``cache.db``).
+    """
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                url = os.getenv("VOCAB_CACHE_URL")
+                _default_cache = (cache_from_url(url) if url
+                                  else PersistentCache(os.getenv("VOCAB_CACHE_DB", DEFAULT_PATH)))
+    return _default_cache
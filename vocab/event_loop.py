@@ -0,0 +1,105 @@
+"""The process-wide event loop and the executor for blocking calls.
+
+Async views, image download jobs and anything else that awaits share one
+event loop that runs for the lifetime of the worker -- the ASGI server's loop
+(see :func:`adopt`) or else one on a daemon thread -- so HTTP sessions and
+in-flight work are reused instead of being tied to a per-request loop.
+Blocking calls (SQLite, WordNet, template rendering) are moved off that loop
+with :func:`run_blocking`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def _start() -> None:
+    global _loop, _loop_thread, _executor, _pid
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def serve() -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    _loop_thread = threading.Thread(target=serve, name="event-loop", daemon=True)
+    _loop_thread.start()
+    ready.wait()
+    _executor = ThreadPoolExecutor(max_workers=int(os.getenv("VOCAB_BLOCKING_THREADS", "16")),
+                                   thread_name_prefix="blocking")
+    _loop, _pid = loop, os.getpid()
+
+
+def adopt(loop: asyncio.AbstractEventLoop) -> None:
+    """Use ``loop`` (an ASGI server's running loop) as this process's loop.
+
+    Must be called from the loop's own thread.  Does nothing if the process
+    already has a loop, so it is safe to call on every request.
+    """
+    global _loop, _loop_thread, _executor, _pid
+    if _loop is not None and _pid == os.getpid():
+        return
+    with _lock:
+        if _loop is None or _pid != os.getpid():
+            _loop_thread = threading.current_thread()
+            _executor = ThreadPoolExecutor(max_workers=int(os.getenv("VOCAB_BLOCKING_THREADS", "16")),
+                                           thread_name_prefix="blocking")
+            _loop, _pid = loop, os.getpid()
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Return this process's event loop, starting it on first use.
+
+    A forked worker (e.g. gunicorn with ``--preload``) gets its own loop.
+    """
+    if _loop is None or _pid != os.getpid():
+        with _lock:
+            if _loop is None or _pid != os.getpid():
+                _start()
+    return _loop
+
+
+def blocking_executor() -> ThreadPoolExecutor:
+    background_loop()
+    return _executor
+
+
+def in_loop_thread() -> bool:
+    return _loop_thread is not None and threading.current_thread() is _loop_thread
+
+
+def run(awaitable: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """Run ``awaitable`` on the background loop and wait for its result.
+
+    Context variables (such as Flask's request context) are carried over.
+    Must not be called from the loop's own thread.
+    """
+    if in_loop_thread():
+        raise RuntimeError("run() would block the event loop it is waiting on")
+    return asyncio.run_coroutine_threadsafe(_as_coroutine(awaitable), background_loop()).result(timeout)
+
+
+async def _as_coroutine(awaitable: Awaitable[T]) -> T:
+    return await awaitable
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call ``func`` on the blocking executor with the caller's context variables."""
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(blocking_executor(), call)
@@ -0,0 +1,75 @@
+"""Pre-render word pages for every word in ``wordlist.txt``.
+
+Writes ``<output>/define/<word>/index.html`` so nginx or a CDN can serve the
+pages directly (e.g. ``try_files $uri $uri/index.html @app``) and only
+``/images`` and unknown words reach the app::
+
+    python -m vocab.export_pages --output export
+
+Words are looked up and stored exactly as the ``/define`` route would;
+files whose content did not change are left untouched.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import quote
+
+CHUNK_SIZE = 500
+
+
+def export(output: str, words: List[str]) -> tuple[int, int, int]:
+    """Render ``words`` below ``output``; return ``(written, unchanged, skipped)``."""
+    from app import create_app, render_word_page, resolve_entry
+
+    app = create_app()
+    repo = app.extensions["vocab"].repo
+    repo.create_tables()
+    written = unchanged = skipped = 0
+    root = Path(output) / "define"
+    for start in range(0, len(words), CHUNK_SIZE):
+        chunk = words[start:start + CHUNK_SIZE]
+        # Warm the repository cache with one query per chunk
+        repo.get_entries(w.lower() for w in chunk)
+        for word in chunk:
+            if "/" in word or word in (".", ".."):
+                skipped += 1
+                continue
+            with app.test_request_context(f"/define/{quote(word)}/"):
+                entry = resolve_entry(word)
+                page = None if entry is None else render_word_page(word, entry)
+            if page is None:
+                skipped += 1
+                continue
+            path = root / word / "index.html"
+            if path.exists() and path.read_bytes() == page.body:
+                unchanged += 1
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name("index.html.part")
+            tmp.write_bytes(page.body)
+            tmp.replace(path)
+            written += 1
+    return written, unchanged, skipped
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="export", help="directory to write pages to")
+    parser.add_argument("--word-file", default="wordlist.txt")
+    args = parser.parse_args(argv)
+
+    from vocab.utils import WordPicker
+
+    words = WordPicker(args.word_file).words
+    started = time.perf_counter()
+    written, unchanged, skipped = export(args.output, words)
+    print(f"Exported {len(words)} words in {time.perf_counter() - started:.1f}s: "
+          f"{written} written, {unchanged} unchanged, {skipped} skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""On-disk index of downloaded image files.
+
+Maps each word to the files stored for it in ``static/images`` together with
+their size, SHA-256 and pixel dimensions, so the ``/images`` route can find
+a word's images with one indexed lookup instead of listing the directory.
+Thumbnails (see :mod:`vocab.thumbnails`) are recorded by content hash.
+The index lives in ``image_index.db``; ``VOCAB_IMAGE_INDEX`` overrides the
+path or, given a database URL such as ``$DATABASE_URL``, moves it into that
+database so every node sees the same files.
+
+Rebuild it from the files on disk with::
+
+    python -m vocab.image_index reconcile [--home-dir ./static/images/]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+DEFAULT_PATH = "image_index.db"
+DEFAULT_HOME_DIR = "./static/images/"
+
+# Downloads are stored as ``{word}{n}{ext}``
+_FILENAME = re.compile(r"^(?P<word>.+?)(?P<number>\d+)\.(?P<ext>[A-Za-z0-9]{1,4})$")
+
+
+class ImageFile(NamedTuple):
+    word: str
+    filename: str
+    size: int
+    sha256: str
+    width: Optional[int]
+    height: Optional[int]
+
+
+def word_for_filename(filename: str) -> Optional[str]:
+    """Return the word a downloaded file belongs to, or ``None``."""
+    match = _FILENAME.match(filename)
+    return match.group("word").lower() if match else None
+
+
+def image_size(data: bytes) -> Optional[tuple[int, int]]:
+    """Return ``(width, height)`` from PNG, GIF, JPEG or WebP header bytes."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return struct.unpack("<HH", data[6:10])
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", data[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            bits = int.from_bytes(data[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+        return None
+    if data[:2] == b"\xff\xd8":
+        pos = 2
+        while pos + 9 < len(data):
+            if data[pos] != 0xFF:
+                pos += 1
+                continue
+            marker = data[pos + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+                pos += 1 if marker == 0xFF else 2
+                continue
+            (length,) = struct.unpack(">H", data[pos + 2:pos + 4])
+            # SOF markers, excluding DHT (C4), JPG (C8) and DAC (CC)
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+                return width, height
+            pos += 2 + length
+    return None
+
+
+def describe(word: str, path: Path) -> ImageFile:
+    """Hash and measure the file at ``path``."""
+    data = path.read_bytes()
+    size = image_size(data)
+    return ImageFile(
+        word=word.lower(),
+        filename=path.name,
+        size=len(data),
+        sha256=hashlib.sha256(data).hexdigest(),
+        width=size[0] if size else None,
+        height=size[1] if size else None,
+    )
+
+
+class ImageIndex:
+    """``word -> files`` index shared by all workers.
+
+    Stored in the SQLite file at ``path`` unless ``connections`` (see
+    :mod:`model.connection`) points it at another database.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, connections=None) -> None:
+        if connections is None:
+            from model.connection import SqliteConnectionManager
+
+            connections = SqliteConnectionManager(path)
+        self.path = path
+        self.db = connections
+        with self.db.writer() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS image_files (
+                    filename TEXT PRIMARY KEY,
+                    word TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    width INTEGER,
+                    height INTEGER,
+                    added_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_image_files_word ON image_files(word)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_image_files_sha256 ON image_files(sha256)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS thumbnails (
+                    sha256 TEXT NOT NULL,
+                    width INTEGER NOT NULL,
+                    path TEXT NOT NULL,
+                    PRIMARY KEY (sha256, width)
+                )
+            """)
+
+    def add(self, image: ImageFile) -> None:
+        with self.db.writer() as conn:
+            conn.execute(
+                "INSERT INTO image_files (word, filename, size, sha256, width, height, added_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (filename) DO UPDATE SET "
+                "word = excluded.word, size = excluded.size, sha256 = excluded.sha256, "
+                "width = excluded.width, height = excluded.height, added_at = excluded.added_at",
+                (*image, time.time()),
+            )
+
+    def add_file(self, word: str, path: Path) -> ImageFile:
+        """Describe ``path`` and record it under ``word``."""
+        image = describe(word, path)
+        self.add(image)
+        return image
+
+    def remove(self, filenames: list[str]) -> None:
+        with self.db.writer() as conn:
+            conn.executemany("DELETE FROM image_files WHERE filename = ?", [(f,) for f in filenames])
+
+    def files_for(self, word: str, limit: Optional[int] = None) -> list[ImageFile]:
+        """Return the files recorded for ``word`` in filename order."""
+        sql = ("SELECT word, filename, size, sha256, width, height FROM image_files "
+               "WHERE word = ? ORDER BY filename")
+        params: tuple = (word.lower(),)
+        if limit is not None:
+            sql, params = f"{sql} LIMIT ?", (*params, limit)
+        with self.db.reader() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [ImageFile(*(row[field] for field in ImageFile._fields)) for row in rows]
+
+    def add_thumbnails(self, sha256: str, paths: dict[int, str]) -> None:
+        """Record thumbnail ``paths`` (``width -> path``) for content ``sha256``."""
+        with self.db.writer() as conn:
+            conn.executemany(
+                "INSERT INTO thumbnails (sha256, width, path) VALUES (?, ?, ?) "
+                "ON CONFLICT (sha256, width) DO UPDATE SET path = excluded.path",
+                [(sha256, width, path) for width, path in paths.items()],
+            )
+
+    def thumbnails_for(self, filenames: list[str]) -> dict[str, dict[int, str]]:
+        """Return ``filename -> {width: path}`` for files that have thumbnails."""
+        if not filenames:
+            return {}
+        placeholders = ", ".join("?" * len(filenames))
+        with self.db.reader() as conn:
+            rows = conn.execute(
+                "SELECT f.filename AS filename, t.width AS width, t.path AS path FROM image_files f "
+                f"JOIN thumbnails t ON t.sha256 = f.sha256 WHERE f.filename IN ({placeholders})",
+                filenames,
+            ).fetchall()
+        found: dict[str, dict[int, str]] = {}
+        for row in rows:
+            found.setdefault(row["filename"], {})[row["width"]] = row["path"]
+        return found
+
+    def filenames(self) -> set[str]:
+        with self.db.reader() as conn:
+            return {row["filename"] for row in conn.execute("SELECT filename FROM image_files").fetchall()}
+
+    def reconcile(self, home_dir: str = DEFAULT_HOME_DIR) -> tuple[int, int]:
+        """Sync the index with the files in ``home_dir``.
+
+        Returns ``(added, removed)``.
+        """
+        on_disk = {}
+        if os.path.isdir(home_dir):
+            for entry in os.scandir(home_dir):
+                word = word_for_filename(entry.name)
+                if entry.is_file() and word:
+                    on_disk[entry.name] = word
+        indexed = self.filenames()
+        stale = sorted(indexed - on_disk.keys())
+        self.remove(stale)
+        added = 0
+        for filename in sorted(on_disk.keys() - indexed):
+            self.add_file(on_disk[filename], Path(home_dir) / filename)
+            added += 1
+        return added, len(stale)
+
+
+_default_index: Optional[ImageIndex] = None
+_default_lock = threading.Lock()
+
+
+def default_index() -> ImageIndex:
+    """Return the process-wide index at ``VOCAB_IMAGE_INDEX`` (default ``image_index.db``)."""
+    global _default_index
+    if _default_index is None:
+        with _default_lock:
+            if _default_index is None:
+                location = os.getenv("VOCAB_IMAGE_INDEX", DEFAULT_PATH)
+                if "://" in location:
+                    from model.connection import connection_manager
+
+                    _default_index = ImageIndex(location, connection_manager(location))
+                else:
+                    _default_index = ImageIndex(location)
+    return _default_index
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m vocab.image_index", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    reconcile_cmd = sub.add_parser("reconcile", help="rebuild the index from the files on disk")
+    reconcile_cmd.add_argument("--home-dir", default=DEFAULT_HOME_DIR)
+    show_cmd = sub.add_parser("show", help="list the indexed files for words")
+    show_cmd.add_argument("words", nargs="+")
+    args = parser.parse_args(argv)
+
+    index = default_index()
+    if args.command == "reconcile":
+        added, removed = index.reconcile(args.home_dir)
+        print(f"Indexed {added} new files, removed {removed} missing files")
+    else:
+        for word in args.words:
+            for image in index.files_for(word):
+                print(f"{word}: {image.filename} {image.size}B {image.width}x{image.height} {image.sha256[:12]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
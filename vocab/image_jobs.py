@@ -0,0 +1,138 @@
+"""Background image download jobs.
+
+Web requests never wait on DuckDuckGo or image hosts: :meth:`ImageJobQueue.submit`
+returns at once with a :class:`ImageJob` whose status and images fill in as
+a fixed pool of download workers makes progress.  Requests for a word that
+is already queued or downloading share the same job.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from vocab.event_loop import background_loop
+from vocab.metrics import IMAGE_JOBS
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class ImageJob:
+    word: str
+    word_id: Optional[int] = None
+    status: str = PENDING
+    images: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+
+class ImageJobQueue:
+    """Run image downloads on the process's background event loop.
+
+    Downloaded files are published to ``store`` (see
+    :mod:`vocab.image_store`) and passed through ``thumbnails`` (a
+    :class:`~vocab.thumbnails.ThumbnailPipeline`) before the job is marked
+    done.  ``on_complete(job)`` is called from a thread pool before a
+    successful job is marked done, which is where callers persist the
+    downloaded images.
+    Finished jobs are kept for ``retain_seconds`` so polling clients see the
+    final result and a word that produced no images is not retried
+    immediately.
+    """
+
+    def __init__(self, home_dir: str, workers: Optional[int] = None,
+                 on_complete: Optional[Callable[[ImageJob], None]] = None,
+                 retain_seconds: float = 300, thumbnails=None, store=None) -> None:
+        self.home_dir = home_dir
+        self.store = store
+        self.workers = workers or int(os.getenv("VOCAB_IMAGE_WORKERS", "2"))
+        self.on_complete = on_complete
+        self.thumbnails = thumbnails
+        self.retain_seconds = retain_seconds
+        self._jobs: Dict[str, ImageJob] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        for status in (PENDING, RUNNING, DONE, FAILED):
+            IMAGE_JOBS.set_function(lambda status=status: self.count(status), status=status)
+
+    def _ensure_started(self) -> None:
+        if self._loop is not None:
+            return
+        self._loop = background_loop()
+        # Never waits on the loop, so submit() is safe from async views too
+        self._loop.call_soon_threadsafe(self._start_workers)
+
+    def _start_workers(self) -> None:
+        self._queue = asyncio.Queue()
+        self._tasks = [self._loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    def _enqueue(self, job: ImageJob) -> None:
+        self._queue.put_nowait(job)
+
+    async def _worker(self) -> None:
+        from vocab.word_images import ImageDownloader
+
+        # Each worker owns a downloader, keeping its HTTP session alive
+        downloader = ImageDownloader(store=self.store)
+        while True:
+            job = await self._queue.get()
+            job.status = RUNNING
+            try:
+                images = await downloader.download_async(job.word, self.home_dir,
+                                                         on_image=job.images.append)
+                job.images[:] = images
+                if self.thumbnails is not None:
+                    await self.thumbnails.process(images)
+                # Only report done once the images are saved, so pollers never see a partial set
+                if self.on_complete is not None:
+                    await self._loop.run_in_executor(None, self.on_complete, job)
+                job.status = DONE
+            except Exception as exc:
+                logger.exception("Image job for %s failed", job.word)
+                job.error = str(exc)
+                job.status = FAILED
+            job.finished_at = time.time()
+
+    def _prune(self, now: float) -> None:
+        expired = [word for word, job in self._jobs.items()
+                   if job.finished and now - job.finished_at > self.retain_seconds]
+        for word in expired:
+            del self._jobs[word]
+
+    def submit(self, word: str, word_id: Optional[int] = None) -> ImageJob:
+        """Queue a download for ``word`` unless one is already in flight."""
+        key = word.lower()
+        with self._lock:
+            self._prune(time.time())
+            job = self._jobs.get(key)
+            if job is not None:
+                return job
+            self._ensure_started()
+            job = self._jobs[key] = ImageJob(word=word, word_id=word_id)
+        self._loop.call_soon_threadsafe(self._enqueue, job)
+        return job
+
+    def count(self, status: str) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status == status)
+
+    def get(self, word: str) -> Optional[ImageJob]:
+        with self._lock:
+            return self._jobs.get(word.lower())
@@ -0,0 +1,126 @@
+"""Where downloaded images and thumbnails are published.
+
+Images are always downloaded and resized in a local working directory
+(``static/images`` by default); a store then makes them available to
+browsers under a stable name such as ``ephemeral1.jpg`` or
+``cas/ab/<sha256>-320.webp``:
+
+* :class:`LocalImageStore` -- the working directory itself, served by
+  Flask (or nginx) below ``/static/images/``.  Only the node that
+  downloaded a file can serve it.
+* :class:`S3ImageStore` -- an S3-compatible bucket shared by every node;
+  needs ``boto3``.
+
+``VOCAB_IMAGE_STORE`` selects the store (``s3://bucket/prefix``; unset
+means local), ``VOCAB_IMAGE_BASE_URL`` the public URL images are served
+from (e.g. a CDN in front of the bucket) and ``VOCAB_S3_ENDPOINT`` a
+non-AWS endpoint such as MinIO.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+DEFAULT_BASE_URL = "/static/images/"
+CACHE_CONTROL = "public, max-age=86400"
+
+
+class LocalImageStore:
+    """Images in a local directory, served as static files."""
+
+    def __init__(self, directory: str, base_url: Optional[str] = None) -> None:
+        self.directory = Path(directory)
+        self.base_url = base_url or DEFAULT_BASE_URL
+
+    def url(self, name: str) -> str:
+        return f"{self.base_url}{name}"
+
+    def exists(self, name: str) -> bool:
+        return (self.directory / name).is_file()
+
+    def save(self, name: str, source: Path) -> None:
+        """Publish the local file ``source`` as ``name``."""
+        target = self.directory / name
+        if Path(source).resolve() == target.resolve():
+            # Downloaded straight into the store
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.part")
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+
+    def delete(self, name: str) -> None:
+        (self.directory / name).unlink(missing_ok=True)
+
+
+class S3ImageStore:
+    """Images in an S3-compatible bucket, shared by every node."""
+
+    def __init__(self, bucket: str, prefix: str = "", base_url: Optional[str] = None,
+                 endpoint_url: Optional[str] = None, client=None) -> None:
+        if client is None:
+            import boto3
+
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.base_url = base_url or f"https://{bucket}.s3.amazonaws.com/"
+        self._client = client
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}{name}"
+
+    def url(self, name: str) -> str:
+        return f"{self.base_url}{self._key(name)}"
+
+    def exists(self, name: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._key(name))
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def save(self, name: str, source: Path) -> None:
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self._client.upload_file(str(source), self.bucket, self._key(name),
+                                 ExtraArgs={"ContentType": content_type, "CacheControl": CACHE_CONTROL})
+
+    def delete(self, name: str) -> None:
+        self._client.delete_object(Bucket=self.bucket, Key=self._key(name))
+
+
+def image_store_from_url(url: Optional[str], directory: str, base_url: Optional[str] = None):
+    """Return the store for ``url`` (``s3://bucket/prefix``), or a local one for ``directory``."""
+    if not url:
+        return LocalImageStore(directory, base_url)
+    parsed = urlparse(url)
+    if parsed.scheme == "s3":
+        return S3ImageStore(parsed.netloc, parsed.path, base_url, os.getenv("VOCAB_S3_ENDPOINT") or None)
+    raise ValueError(f"unsupported image store URL {url!r}")
+
+
+_stores: Dict[Tuple[Optional[str], str], object] = {}
+_stores_lock = threading.Lock()
+
+
+def default_image_store(directory: str):
+    """Return the process-wide store configured by ``VOCAB_IMAGE_STORE`` for ``directory``."""
+    url = os.getenv("VOCAB_IMAGE_STORE") or None
+    key = (url, os.path.abspath(directory))
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = _stores[key] = image_store_from_url(url, directory, os.getenv("VOCAB_IMAGE_BASE_URL"))
+    return store
@@ -0,0 +1,218 @@
+"""Precomputed, memory-mapped WordNet lexicon index.
+
+The index is built offline from NLTK's WordNet corpus and lets
+:class:`~vocab.word_details.WordDetailsService` answer lookups without
+importing NLTK at all.  File layout (all integers little endian)::
+
+    header   magic "VLEX", version, entry count, slot count, blob offset
+    slots    slot count x uint32, offset + 1 of a record in the blob (0 = empty)
+    blob     records: uint32 length + UTF-8 "key \\x1f senses" (see ``pack_senses``)
+
+Keys are hashed with CRC32 into an open-addressed table with linear probing,
+so a lookup touches a handful of pages of the mapped file.
+
+Build with ``python -m vocab.lexicon_index build --output lexicon.idx``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Iterable, Optional
+
+from vocab.word_details import Sense, load_wordnet, pack_senses, senses_from_synsets, unpack_senses
+
+MAGIC = b"VLEX"
+VERSION = 2
+DEFAULT_PATH = "lexicon.idx"
+
+_HEADER = struct.Struct("<4sIIII")
+_SLOT = struct.Struct("<I")
+_FIELD_SEP = "\x1f"
+
+# WordNet's detachment rules (see ``nltk.corpus.reader.wordnet.morphy``),
+# used to map inflected forms onto indexed lemmas.
+_MORPHY_SUBSTITUTIONS = (
+    ("s", ""), ("ses", "s"), ("ves", "f"), ("xes", "x"), ("zes", "z"),
+    ("ches", "ch"), ("shes", "sh"), ("men", "man"), ("ies", "y"),
+    ("es", "e"), ("es", ""), ("ed", "e"), ("ed", ""), ("ing", "e"),
+    ("ing", ""), ("er", ""), ("est", ""), ("er", "e"), ("est", "e"),
+)
+
+
+def normalize(word: str) -> str:
+    """Return the key under which ``word`` is stored in the index."""
+    return word.strip().lower().replace(" ", "_")
+
+
+def _hash(key: bytes) -> int:
+    return zlib.crc32(key) & 0xFFFFFFFF
+
+
+def _encode_record(key: str, senses: Iterable[Sense]) -> bytes:
+    payload = f"{key}{_FIELD_SEP}{pack_senses(senses)}".encode("utf-8")
+    return _SLOT.pack(len(payload)) + payload
+
+
+def write_index(path: str, entries: Iterable[tuple[str, Iterable[Sense]]]) -> int:
+    """Write ``(key, senses)`` entries to ``path``.
+
+    Returns the number of records written.  The file is written to a
+    temporary name and renamed into place so readers never see a partial
+    index.
+    """
+    blob = bytearray()
+    offsets: dict[str, int] = {}
+    for key, senses in entries:
+        key = normalize(key)
+        if key in offsets:
+            continue
+        offsets[key] = len(blob)
+        blob += _encode_record(key, senses)
+
+    slot_count = max(8, len(offsets) * 2)
+    slots = [0] * slot_count
+    for key, offset in offsets.items():
+        slot = _hash(key.encode("utf-8")) % slot_count
+        while slots[slot]:
+            slot = (slot + 1) % slot_count
+        slots[slot] = offset + 1
+
+    blob_offset = _HEADER.size + slot_count * _SLOT.size
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(offsets), slot_count, blob_offset))
+        f.write(struct.pack(f"<{slot_count}I", *slots))
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return len(offsets)
+
+
+class LexiconIndex:
+    """Read-only view of an index written by :func:`write_index`."""
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = _HEADER.unpack_from(self._mm, 0)
+        magic, version, self._count, self._slot_count, self._blob_offset = header
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} lexicon index")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, word: str) -> bool:
+        return self._find(normalize(word)) is not None
+
+    def _record(self, offset: int) -> list[str]:
+        start = self._blob_offset + offset
+        (length,) = _SLOT.unpack_from(self._mm, start)
+        start += _SLOT.size
+        return self._mm[start:start + length].decode("utf-8").split(_FIELD_SEP, 1)
+
+    def _find(self, key: str) -> Optional[list[str]]:
+        encoded = key.encode("utf-8")
+        slot = _hash(encoded) % self._slot_count
+        for _ in range(self._slot_count):
+            (value,) = _SLOT.unpack_from(self._mm, _HEADER.size + slot * _SLOT.size)
+            if not value:
+                return None
+            record = self._record(value - 1)
+            if record[0] == key:
+                return record
+            slot = (slot + 1) % self._slot_count
+        return None
+
+    def lookup(self, word: str) -> Optional[tuple[Sense, ...]]:
+        """Return the senses of ``word`` or ``None``.
+
+        Inflected forms are resolved with WordNet's detachment rules when the
+        exact form is not indexed.
+        """
+        key = normalize(word)
+        record = self._find(key)
+        if record is None:
+            for suffix, replacement in _MORPHY_SUBSTITUTIONS:
+                if key.endswith(suffix) and len(key) > len(suffix):
+                    record = self._find(key[: -len(suffix)] + replacement)
+                    if record is not None:
+                        break
+        if record is None:
+            return None
+        return unpack_senses(record[1])
+
+    def keys(self) -> Iterable[str]:
+        """Yield every indexed key in file order."""
+        end = len(self._mm)
+        pos = self._blob_offset
+        while pos < end:
+            (length,) = _SLOT.unpack_from(self._mm, pos)
+            pos += _SLOT.size
+            yield self._mm[pos:pos + length].decode("utf-8").split(_FIELD_SEP, 1)[0]
+            pos += length
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def iter_wordnet_entries() -> Iterable[tuple[str, tuple[Sense, ...]]]:
+    """Yield ``(key, senses)`` for every WordNet lemma.
+
+    Inflected forms from WordNet's exception lists are included so that
+    irregular forms such as ``geese`` resolve without NLTK at runtime.
+    Each synset is extracted once and shared by all of its lemmas.
+    """
+    wordnet = load_wordnet()
+    keys = set(wordnet.all_lemma_names())
+    for pos in wordnet._exception_map.values():
+        keys.update(pos.keys())
+    synset_cache: dict = {}
+    for key in sorted(keys):
+        senses = senses_from_synsets(key, wordnet.synsets(key), synset_cache)
+        if senses:
+            yield key, senses
+
+
+def build(path: str = DEFAULT_PATH) -> int:
+    """Build the index at ``path`` from NLTK's WordNet corpus."""
+    return write_index(path, iter_wordnet_entries())
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m vocab.lexicon_index", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="build the index from WordNet")
+    build_cmd.add_argument("--output", default=os.getenv("VOCAB_LEXICON_INDEX", DEFAULT_PATH))
+    lookup_cmd = sub.add_parser("lookup", help="look up words in an existing index")
+    lookup_cmd.add_argument("--index", default=os.getenv("VOCAB_LEXICON_INDEX", DEFAULT_PATH))
+    lookup_cmd.add_argument("words", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        count = build(args.output)
+        size = os.path.getsize(args.output)
+        print(f"Wrote {count} entries ({size / 1e6:.1f} MB) to {args.output} "
+              f"in {time.perf_counter() - started:.1f}s")
+        return 0
+
+    index = LexiconIndex(args.index)
+    for word in args.words:
+        senses = index.lookup(word) or ()
+        print(f"{word}: {len(senses)} senses")
+        for sense in senses:
+            print(f"  ({sense.pos}) {sense.definition}; synonyms: {', '.join(sense.synonyms)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
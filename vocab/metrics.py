@@ -0,0 +1,234 @@
+"""In-process metrics in the Prometheus text format.
+
+A tiny, dependency-free subset of ``prometheus_client``: counters, gauges
+and histograms with labels, registered on :data:`REGISTRY` and rendered by
+``/metrics``.  Recording can be switched off at runtime
+(:meth:`Registry.disable`, or ``VOCAB_METRICS=0`` at startup); every
+``inc``/``observe``/``time`` call then returns immediately.
+
+Values are per process: under gunicorn each worker reports its own.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Seconds; tuned for sub-millisecond cache hits up to multi-second downloads
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTE_BUCKETS = (1024, 8192, 32768, 131072, 524288, 1048576, 2097152, 5242880)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Registry:
+    """Holds metrics and the process-wide on/off switch."""
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._metrics: List["_Metric"] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            self._metrics.append(metric)
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in list(self._metrics):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry(enabled=os.getenv("VOCAB_METRICS", "1").lower() not in ("0", "false", "off"))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Registry = REGISTRY) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _Value(_Metric):
+    """Shared implementation of counters and gauges."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> bool:
+        """Add ``amount``; returns whether it was recorded (metrics enabled)."""
+        if not self.registry.enabled:
+            return False
+        self._add(amount, labels)
+        return True
+
+    def _add(self, amount: float, labels: Dict[str, str]) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_function(self, function: Callable[[], float], **labels: str) -> None:
+        """Report ``function()`` at scrape time, for values tracked elsewhere."""
+        self._functions[self._key(labels)] = function
+
+    def value(self, **labels: str) -> float:
+        key = self._key(labels)
+        if key in self._functions:
+            return self._functions[key]()
+        return self._values.get(key, 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        for key, function in self._functions.items():
+            try:
+                values[key] = function()
+            except Exception:
+                continue
+        suffix = "_total" if self.kind == "counter" else ""
+        return [f"{self.name}{suffix}{self._labels(key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+
+class Counter(_Value):
+    kind = "counter"
+
+
+class Gauge(_Value):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        """Undo an earlier :meth:`inc`.
+
+        Applied even while recording is disabled, so an ``inc`` made before
+        metrics were switched off is still matched.  Callers must only
+        ``dec`` what they actually incremented.
+        """
+        self._add(-amount, labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        incremented = self.inc(**labels)
+        try:
+            yield
+        finally:
+            if incremented:
+                self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Registry = REGISTRY) -> None:
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts incl. +Inf, sum)
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the ``with`` block."""
+        if not self.registry.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = {key: (list(counts), total[0]) for key, (counts, total) in self._series.items()}
+        lines = []
+        for key, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._labels(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+# Metrics recorded across the app.  Cache results are "hit" or "miss".
+DB_QUERY_SECONDS = Histogram("vocab_db_query_seconds", "WordRepository call duration", ["method"])
+WORDNET_SECONDS = Histogram("vocab_wordnet_lookup_seconds", "Definition and synonym lookup duration",
+                            ["source"])
+IMAGE_SEARCH_SECONDS = Histogram("vocab_image_search_seconds", "Image search request duration")
+IMAGE_DOWNLOAD_SECONDS = Histogram("vocab_image_download_seconds", "Single image download duration",
+                                   ["result"])
+IMAGE_DOWNLOAD_BYTES = Histogram("vocab_image_download_bytes", "Size of downloaded images",
+                                 buckets=BYTE_BUCKETS)
+CACHE_REQUESTS = Counter("vocab_cache_requests", "Cache lookups by cache layer and result",
+                         ["cache", "result"])
+REQUEST_SECONDS = Histogram("vocab_request_seconds", "HTTP request duration", ["endpoint", "method"])
+IN_FLIGHT = Gauge("vocab_in_flight", "Operations currently in progress", ["operation"])
+IMAGE_JOBS = Gauge("vocab_image_jobs", "Tracked background image jobs by status", ["status"])
+RATELIMIT_THROTTLED = Counter("vocab_ratelimit_throttled", "Outgoing requests delayed by a host's rate limit",
+                              ["kind"])
+RATELIMIT_WAIT_SECONDS = Counter("vocab_ratelimit_wait_seconds", "Time outgoing requests waited for a rate limit",
+                                 ["kind"])
+
+
+def cache_result(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
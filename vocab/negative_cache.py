@@ -0,0 +1,133 @@
+"""Negative cache for words WordNet does not know.
+
+Typos and crawler paths used to create ``words`` rows holding "No
+definitions found" and to trigger image searches.  Known-missing words are
+now recorded in the ``missing_words`` table with a TTL, and a Bloom filter
+over that table lets the common case (a word that is *not* missing) skip the
+database entirely.
+
+Clean up rows written before the negative cache existed with::
+
+    python -m vocab.negative_cache cleanup
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import math
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from vocab.metrics import cache_result
+
+DEFAULT_TTL = 7 * 24 * 3600
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives)."""
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Kirsch-Mitzenmacher: k positions from two 64-bit hashes
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(item))
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class NegativeCache:
+    """Known-missing words: a Bloom filter in front of ``repo.missing_words``.
+
+    :meth:`contains` only queries the database when the filter reports a
+    possible hit.  The filter is rebuilt from the table once it holds
+    ``capacity`` additions, which also drops expired words from it.
+    """
+
+    def __init__(self, repo, ttl: float = DEFAULT_TTL, capacity: int = 100_000) -> None:
+        self.repo = repo
+        self.ttl = ttl
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._filter = self._build()
+
+    def _build(self) -> BloomFilter:
+        words = self.repo.missing_words(time.time())
+        bloom = BloomFilter(max(self.capacity, 2 * len(words)))
+        for word in words:
+            bloom.add(word)
+        return bloom
+
+    def contains(self, word: str) -> bool:
+        word = word.lower()
+        if word not in self._filter:
+            cache_result("negative_bloom", False)
+            return False
+        missing = self.repo.is_missing(word, time.time())
+        cache_result("negative", missing)
+        return missing
+
+    __contains__ = contains
+
+    def add(self, word: str) -> None:
+        word = word.lower()
+        self.repo.mark_missing(word, time.time() + self.ttl)
+        with self._lock:
+            if self._filter.full:
+                self._filter = self._build()
+            else:
+                self._filter.add(word)
+
+
+def cleanup(repo) -> tuple[int, int]:
+    """Delete junk word rows and purge expired negative entries.
+
+    Deleted words are not marked missing here: some rows only hold a
+    transient lookup error, so each word is re-checked on its next request.
+    Returns ``(deleted, purged)``.
+    """
+    deleted = repo.delete_words(repo.junk_words())
+    purged = repo.purge_expired_missing(time.time())
+    return deleted, purged
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("cleanup", help="delete junk word rows and expired negative entries")
+    parser.parse_args(argv)
+
+    from model.word import WordRepository
+
+    repo = WordRepository()
+    repo.create_tables()
+    try:
+        deleted, purged = cleanup(repo)
+    finally:
+        repo.close()
+    print(f"Deleted {deleted} junk words, purged {purged} expired missing words")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Cache of rendered word pages.
+
+A word page only depends on what is stored for the word (images are fetched
+by the page itself), so rendered HTML is keyed by a digest of the template
+and the page's content.  The digest doubles as the page's ETag: when a word
+or the template changes the key changes with it, and nothing ever has to be
+invalidated.
+
+Pages live in a bounded in-memory LRU and, when ``directory`` is set (see
+``VOCAB_PAGE_CACHE_DIR``), pages worth keeping are also written to disk so
+they survive restarts and are shared by all workers.  The directory holds at
+most ``max_disk_pages`` files; the oldest are removed beyond that.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from vocab.metrics import cache_result
+
+
+class Page(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: float
+
+
+def content_version(*parts) -> str:
+    """Stable digest of JSON-serializable ``parts``."""
+    data = json.dumps(parts, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+class PageCache:
+    """Thread-safe LRU of :class:`Page` keyed by content version, optionally on disk."""
+
+    def __init__(self, maxsize: int = 2000, directory: Optional[str] = None,
+                 max_disk_pages: int = 50000) -> None:
+        self.maxsize = maxsize
+        self.directory = Path(directory) if directory else None
+        self.max_disk_pages = max_disk_pages
+        self._pages: OrderedDict[str, Page] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_pages: Optional[int] = None
+
+    def _path(self, version: str) -> Path:
+        return self.directory / version[:2] / f"{version}.html"
+
+    def _remember(self, version: str, page: Page) -> None:
+        with self._lock:
+            self._pages[version] = page
+            self._pages.move_to_end(version)
+            while len(self._pages) > self.maxsize:
+                self._pages.popitem(last=False)
+
+    def get(self, version: str) -> Optional[Page]:
+        with self._lock:
+            page = self._pages.get(version)
+            if page is not None:
+                self._pages.move_to_end(version)
+        cache_result("pages", page is not None)
+        if page is not None or self.directory is None:
+            return page
+        path = self._path(version)
+        try:
+            page = Page(path.read_bytes(), version, path.stat().st_mtime)
+        except FileNotFoundError:
+            cache_result("pages_disk", False)
+            return None
+        cache_result("pages_disk", True)
+        self._remember(version, page)
+        return page
+
+    def put(self, version: str, body: bytes, persist: bool = True) -> Page:
+        """Cache ``body``; only pages with ``persist`` set are written to disk."""
+        page = Page(body, version, time.time())
+        if self.directory is not None and persist:
+            path = self._path(version)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.part")
+            tmp.write_bytes(body)
+            os.replace(tmp, path)
+            self._count_disk_page()
+        self._remember(version, page)
+        return page
+
+    def _disk_files(self) -> list:
+        return list(self.directory.glob("*/*.html"))
+
+    def _count_disk_page(self) -> None:
+        with self._lock:
+            if self._disk_pages is None:
+                self._disk_pages = len(self._disk_files())
+            else:
+                self._disk_pages += 1
+            if self._disk_pages <= self.max_disk_pages:
+                return
+            # Other workers write to the same directory, so count again while pruning
+            self._disk_pages = self._prune_disk()
+
+    def _prune_disk(self) -> int:
+        """Remove the oldest pages down to 90% of the limit; return how many remain."""
+        files = []
+        for path in self._disk_files():
+            try:
+                files.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                pass
+        files.sort()
+        excess = len(files) - int(self.max_disk_pages * 0.9)
+        for _, path in files[:max(0, excess)]:
+            path.unlink(missing_ok=True)
+        return len(files) - max(0, excess)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+    def __len__(self) -> int:
+        return len(self._pages)
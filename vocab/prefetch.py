@@ -0,0 +1,141 @@
+"""Warm the database with every word from ``wordlist.txt``.
+
+Usage::
+
+    python -m vocab.prefetch [--workers 4] [--batch-size 200] [--images] [--refresh]
+
+Word senses are extracted in batches across a process pool (synsets shared
+by words in a batch are read once) and written in batched transactions.
+Words already in the database are skipped, so an interrupted run can simply
+be restarted; ``--refresh`` re-extracts them too.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from model.word import WordRepository
+from vocab.utils import WordPicker
+from vocab.word_details import Sense, WordDetailsService
+
+_service: Optional[WordDetailsService] = None
+
+
+def _init_worker() -> None:
+    global _service
+    _service = WordDetailsService()
+
+
+def _resolve(words: list[str]) -> list[tuple[str, tuple[Sense, ...]]]:
+    # Words WordNet does not know (or that failed) are left out
+    return [(word, details.senses) for word, details in _service.get_many(words).items() if details.senses]
+
+
+def prefetch_details(repo: WordRepository, words: list[str], workers: int, batch_size: int) -> int:
+    """Resolve and store details for ``words``; return how many were written."""
+    written = done = 0
+    started = time.perf_counter()
+    batches = [words[i:i + batch_size] for i in range(0, len(words), batch_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for batch, entries in zip(batches, pool.map(_resolve, batches)):
+            written += len(repo.insert_entries(entries))
+            done += len(batch)
+            _report("details", done, len(words), started)
+    print(f"[details] stored {written} of {len(words)} words")
+    return written
+
+
+async def prefetch_images(repo: WordRepository, word_ids: dict[str, int], home_dir: str,
+                          concurrency: int) -> int:
+    """Download images for ``word_ids`` with at most ``concurrency`` words in flight.
+
+    Thumbnails are generated the same way as for the app's download jobs.
+    """
+    from vocab.rate_limit import close_shared_session
+    from vocab.thumbnails import ThumbnailPipeline
+    from vocab.word_images import ImageDownloader
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in word_ids.items():
+        queue.put_nowait(item)
+    done = 0
+    started = time.perf_counter()
+    thumbnails = ThumbnailPipeline(home_dir)
+
+    async def worker() -> None:
+        nonlocal done
+        # ImageDownloader keeps per-download state, so each worker owns one
+        downloader = ImageDownloader()
+        try:
+            while True:
+                try:
+                    word, word_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                images = await downloader.download_async(word, home_dir)
+                if images:
+                    await thumbnails.process(images)
+                    repo.insert_images(word_id, images)
+                done += 1
+                _report("images", done, len(word_ids), started)
+        finally:
+            await downloader.close()
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        thumbnails.close()
+        await close_shared_session()
+    return done
+
+
+def _report(stage: str, done: int, total: int, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(f"[{stage}] {done}/{total} words, {rate:.1f} words/s, {elapsed:.1f}s elapsed")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m vocab.prefetch", description=__doc__.splitlines()[0])
+    parser.add_argument("--word-file", default="wordlist.txt")
+    parser.add_argument("--workers", type=int, default=4, help="processes resolving word details")
+    parser.add_argument("--batch-size", type=int, default=200, help="words per database transaction")
+    parser.add_argument("--images", action="store_true", help="also download images")
+    parser.add_argument("--image-concurrency", type=int, default=2, help="words downloading images at once")
+    parser.add_argument("--home-dir", default="./static/images/")
+    parser.add_argument("--refresh", action="store_true", help="re-extract words that are already stored")
+    args = parser.parse_args(argv)
+
+    # Refreshed entries must also be dropped from a shared entry cache
+    shared_cache = None
+    if os.getenv("VOCAB_CACHE_URL"):
+        from vocab.cache_store import default_cache
+
+        shared_cache = default_cache()
+    repo = WordRepository(shared_cache=shared_cache)
+    repo.create_tables()
+    words = list(dict.fromkeys(w.lower() for w in WordPicker(args.word_file).words))
+    existing = {} if args.refresh else repo.find_words(words)
+    missing = [w for w in words if w not in existing]
+    print(f"{len(words)} words in {args.word_file}, {len(existing)} already stored, {len(missing)} to fetch")
+    if missing:
+        prefetch_details(repo, missing, args.workers, args.batch_size)
+
+    if args.images:
+        word_ids = repo.find_words(words)
+        with_images = repo.words_with_images(word_ids.values())
+        pending = {w: i for w, i in word_ids.items() if i not in with_images}
+        print(f"{len(pending)} words without images")
+        if pending:
+            asyncio.run(prefetch_images(repo, pending, args.home_dir, args.image_concurrency))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Process-wide token-bucket rate limiting and a shared HTTP session.
+
+Every outgoing request for image search or download first takes a token
+from the bucket of its host, so concurrent downloads in any thread or
+event loop share one budget per origin instead of each tracking its own
+last-request time.  A 403/429 response penalizes the host's bucket, which
+backs off every caller at once.  Throttled requests and the time they wait
+are exported as ``vocab_ratelimit_*`` metrics labelled ``search`` or
+``image``; image hosts are unbounded, so they share one label.  Buckets that
+have refilled completely are dropped once there are more than
+``RateLimiter.max_buckets``, since a fresh bucket would behave the same.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import weakref
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from vocab.metrics import RATELIMIT_THROTTLED, RATELIMIT_WAIT_SECONDS
+
+# DuckDuckGo allows roughly one image search every two seconds
+SEARCH_HOST = "duckduckgo.com"
+SEARCH_RATE = 0.5
+SEARCH_BURST = 1
+
+
+class TokenBucket:
+    """Thread-safe token bucket; callers reserve a token and sleep off any debt."""
+
+    def __init__(self, rate: float, burst: float, kind: str = "image") -> None:
+        self.kind = kind
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+        if wait:
+            RATELIMIT_THROTTLED.inc(kind=self.kind)
+            RATELIMIT_WAIT_SECONDS.inc(wait, kind=self.kind)
+        return wait
+
+    def penalize(self, seconds: float) -> None:
+        """Push the next available token at least ``seconds`` into the future."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def settled(self) -> bool:
+        """Whether the bucket is full again, i.e. the same as a new one."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens >= self.burst
+
+    async def acquire(self) -> None:
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class RateLimiter:
+    """Per-host token buckets with a default budget for unknown hosts."""
+
+    max_buckets = 256
+
+    def __init__(self, default_rate: float = 2.0, default_burst: float = 4,
+                 budgets: Optional[Dict[str, tuple]] = None) -> None:
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.budgets = {SEARCH_HOST: (SEARCH_RATE, SEARCH_BURST)}
+        self.budgets.update(budgets or {})
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host(url_or_host: str) -> str:
+        if "//" not in url_or_host:
+            return url_or_host
+        return urlparse(url_or_host).hostname or url_or_host
+
+    def bucket(self, url_or_host: str) -> TokenBucket:
+        host = self.host(url_or_host)
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    if len(self._buckets) >= self.max_buckets:
+                        self._evict_settled()
+                    rate, burst = self.budgets.get(host, (self.default_rate, self.default_burst))
+                    kind = "search" if host == SEARCH_HOST else "image"
+                    bucket = self._buckets[host] = TokenBucket(rate, burst, kind)
+        return bucket
+
+    def _evict_settled(self) -> None:
+        for host, bucket in list(self._buckets.items()):
+            if bucket.settled():
+                del self._buckets[host]
+
+    async def acquire(self, url_or_host: str) -> None:
+        await self.bucket(url_or_host).acquire()
+
+    def penalize(self, url_or_host: str, seconds: float) -> None:
+        self.bucket(url_or_host).penalize(seconds)
+
+
+_limiter = RateLimiter()
+
+
+def default_limiter() -> RateLimiter:
+    return _limiter
+
+
+_sessions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_sessions_lock = threading.Lock()
+
+
+def shared_session():
+    """Return the long-lived ``aiohttp.ClientSession`` for the running loop.
+
+    Sessions are bound to an event loop, so there is one per loop; the
+    background image workers run on a single persistent loop and therefore
+    share one pooled, keep-alive connector with DNS caching.
+    """
+    import aiohttp
+
+    loop = asyncio.get_running_loop()
+    with _sessions_lock:
+        session = _sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=64, limit_per_host=8,
+                                             ttl_dns_cache=300, keepalive_timeout=30)
+            session = _sessions[loop] = aiohttp.ClientSession(connector=connector)
+        return session
+
+
+async def close_shared_session() -> None:
+    """Close the running loop's shared session, if any."""
+    with _sessions_lock:
+        session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
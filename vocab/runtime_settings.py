@@ -0,0 +1,74 @@
+"""Runtime switches shared by every worker: metrics recording and log level.
+
+``POST /metrics`` stores the settings in the process-wide cache (see
+:func:`vocab.cache_store.default_cache`): SQLite shared by the workers of a
+node, or ``VOCAB_CACHE_URL`` shared by every node.  Each worker re-reads
+them at most every ``check_interval`` seconds at the start of a request, so
+a change reaches all workers within a few seconds.  Until something is
+stored, ``VOCAB_METRICS`` and ``LOG_LEVEL`` apply.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Optional
+
+from vocab.metrics import REGISTRY
+
+NAMESPACE = "settings"
+KEY = "runtime"
+# Settings outlive any deployment; an expired entry falls back to the environment
+TTL = 365 * 24 * 3600
+
+
+class RuntimeSettings:
+    def __init__(self, cache, check_interval: float = 5.0) -> None:
+        self.cache = cache
+        self.check_interval = check_interval
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def current() -> dict:
+        return {"enabled": REGISTRY.enabled, "log_level": logging.getLevelName(logging.getLogger().level)}
+
+    @staticmethod
+    def _apply(settings: dict) -> None:
+        if "enabled" in settings:
+            if settings["enabled"]:
+                REGISTRY.enable()
+            else:
+                REGISTRY.disable()
+        if "log_level" in settings:
+            logging.getLogger().setLevel(settings["log_level"])
+
+    def refresh(self) -> None:
+        """Apply the shared settings if ``check_interval`` has passed since the last check."""
+        now = time.monotonic()
+        if now < self._next_check or not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = now + self.check_interval
+            self._apply(self.cache.get(NAMESPACE, KEY) or {})
+        finally:
+            self._lock.release()
+
+    def update(self, enabled: Optional[bool] = None, log_level: Optional[str] = None) -> dict:
+        """Store new settings for every worker and apply them here; return the result.
+
+        Raises :class:`ValueError` for an unknown log level.
+        """
+        changes = {}
+        if enabled is not None:
+            changes["enabled"] = enabled
+        if log_level is not None:
+            level = logging.getLevelName(log_level.upper())
+            if not isinstance(level, int):
+                raise ValueError(f"unknown log level {log_level!r}")
+            changes["log_level"] = logging.getLevelName(level)
+        settings = {**(self.cache.get(NAMESPACE, KEY) or {}), **changes}
+        self.cache.set(NAMESPACE, KEY, settings, TTL)
+        self._apply(settings)
+        return self.current()
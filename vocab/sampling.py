@@ -0,0 +1,93 @@
+"""Constant-time sampling primitives used by :class:`vocab.utils.WordPicker`."""
+
+from __future__ import annotations
+
+import hashlib
+import random
+from typing import List, Sequence, Tuple
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per weighted draw."""
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        n = len(weights)
+        if n == 0:
+            raise ValueError("cannot sample from an empty population")
+        total = float(sum(weights))
+        if total <= 0 or any(w < 0 for w in weights):
+            raise ValueError("weights must be non-negative with a positive sum")
+        scaled = [w * n / total for w in weights]
+        self.prob: List[float] = [0.0] * n
+        self.alias: List[int] = [0] * n
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left is 1 up to rounding error
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def sample(self, rng: random.Random = random) -> int:
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+class FeistelPermutation:
+    """Keyed pseudo-random permutation of ``range(size)``.
+
+    ``index(i)`` maps the i-th step of a shuffle to a position in O(1)
+    expected time without materialising the permutation, so a shuffled walk
+    over a list is fully described by ``(seed, cursor)``.
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, size: int, seed: int) -> None:
+        if size <= 0:
+            raise ValueError("size must be positive")
+        self.size = size
+        self._key = seed.to_bytes(16, "little", signed=False)
+        bits = max(2, (size - 1).bit_length())
+        self._half = (bits + 1) // 2
+        self._mask = (1 << self._half) - 1
+
+    def _round(self, value: int, round_no: int) -> int:
+        digest = hashlib.blake2b(value.to_bytes(8, "little") + bytes((round_no,)),
+                                 digest_size=8, key=self._key).digest()
+        return int.from_bytes(digest, "little") & self._mask
+
+    def _encrypt(self, value: int) -> int:
+        left, right = value >> self._half, value & self._mask
+        for round_no in range(self.ROUNDS):
+            left, right = right, left ^ self._round(right, round_no)
+        return (left << self._half) | right
+
+    def index(self, i: int) -> int:
+        # Cycle-walk until the output falls inside range(size)
+        value = i
+        while True:
+            value = self._encrypt(value)
+            if value < self.size:
+                return value
+
+
+def new_seed(rng: random.Random = random) -> int:
+    return rng.getrandbits(64)
+
+
+def shuffle_step(size: int, seed: int, position: int) -> Tuple[int, int, int]:
+    """Return ``(index, seed, next_position)`` for a no-repeat shuffle.
+
+    A fresh seed starts a new pass once every index has been returned.
+    """
+    if position >= size:
+        seed, position = new_seed(), 0
+    return FeistelPermutation(size, seed).index(position), seed, position + 1
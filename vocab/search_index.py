@@ -0,0 +1,224 @@
+"""In-memory prefix and spelling-suggestion index.
+
+:class:`SearchIndex` keeps its words in a sorted list for prefix lookups
+(binary search) and a SymSpell-style deletion index for edit-distance
+suggestions: every word is indexed under the strings obtained by deleting up
+to ``max_distance`` characters from its first ``prefix_length`` characters,
+and a query only has to generate its own deletions and look them up.
+Deletions are stored as sorted ``(crc32, word index)`` pairs in flat arrays
+so that indexing all WordNet lemmas stays compact.
+
+:class:`Suggester` combines a small, exact index over ``wordlist.txt`` with
+a larger one over all WordNet lemmas that is built on a background thread.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import threading
+import zlib
+from array import array
+from itertools import combinations
+from typing import Callable, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(word: str) -> str:
+    return word.strip().lower().replace(" ", "_")
+
+
+def _deletes(word: str, max_distance: int, prefix_length: int) -> set[str]:
+    prefix = word[:prefix_length]
+    found = {prefix}
+    for distance in range(1, min(max_distance, len(prefix)) + 1):
+        for positions in combinations(range(len(prefix)), distance):
+            found.add("".join(c for i, c in enumerate(prefix) if i not in positions))
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or ``limit + 1`` once it exceeds ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SearchIndex:
+    """Prefix and fuzzy lookups over a fixed set of words."""
+
+    def __init__(self, words: Iterable[str], max_distance: int = 2, prefix_length: int = 7) -> None:
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.words: List[str] = sorted({normalize(w) for w in words if w.strip()})
+        pairs = sorted(
+            (zlib.crc32(delete.encode("utf-8")) << 32) | i
+            for i, word in enumerate(self.words)
+            for delete in _deletes(word, max_distance, prefix_length)
+        )
+        self._hashes = array("I", (pair >> 32 for pair in pairs))
+        self._ids = array("I", (pair & 0xFFFFFFFF for pair in pairs))
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        key = normalize(word)
+        i = bisect.bisect_left(self.words, key)
+        return i < len(self.words) and self.words[i] == key
+
+    def prefix(self, query: str, limit: int = 10) -> List[str]:
+        """Return up to ``limit`` words starting with ``query``, alphabetically."""
+        key = normalize(query)
+        if not key:
+            return []
+        start = bisect.bisect_left(self.words, key)
+        found = []
+        for word in self.words[start:start + limit]:
+            if not word.startswith(key):
+                break
+            found.append(word)
+        return found
+
+    def suggest(self, query: str, limit: int = 5) -> List[tuple[str, int]]:
+        """Return ``(word, distance)`` pairs within ``max_distance`` of ``query``.
+
+        Sorted by distance, then closeness in length, then alphabetically.
+        """
+        key = normalize(query)
+        if not key:
+            return []
+        candidates = set()
+        for delete in _deletes(key, self.max_distance, self.prefix_length):
+            h = zlib.crc32(delete.encode("utf-8"))
+            i = bisect.bisect_left(self._hashes, h)
+            while i < len(self._hashes) and self._hashes[i] == h:
+                candidates.add(self._ids[i])
+                i += 1
+        scored = []
+        for i in candidates:
+            word = self.words[i]
+            distance = edit_distance(key, word, self.max_distance)
+            if distance <= self.max_distance:
+                scored.append((distance, abs(len(word) - len(key)), word))
+        scored.sort()
+        return [(word, distance) for distance, _, word in scored[:limit]]
+
+
+def display(word: str) -> str:
+    return word.replace("_", " ")
+
+
+class Suggester:
+    """Autocomplete and "did you mean" over the word list plus WordNet lemmas.
+
+    ``word_source`` returns the current word list, re-indexed on a
+    background thread when ``version_source`` changes while the previous
+    index keeps serving; ``lemma_source`` returns every lemma and is indexed
+    on a background thread too, so suggestions start with the word list
+    alone and widen once the lemma index is ready.
+    """
+
+    def __init__(self, word_source: Callable[[], Sequence[str]],
+                 version_source: Callable[[], object] = lambda: None,
+                 lemma_source: Optional[Callable[[], Iterable[str]]] = None) -> None:
+        self._word_source = word_source
+        self._version_source = version_source
+        self._version = version_source()
+        self.words = SearchIndex(word_source())
+        self._rebuild_lock = threading.Lock()
+        self.lemmas: Optional[SearchIndex] = None
+        self._lemmas_pending = lemma_source is not None
+        if lemma_source is not None:
+            threading.Thread(target=self._build_lemmas, args=(lemma_source,),
+                             name="lemma-index", daemon=True).start()
+
+    def _build_lemmas(self, lemma_source: Callable[[], Iterable[str]]) -> None:
+        try:
+            # Distance 1 keeps the deletion index small for ~150k lemmas
+            self.lemmas = SearchIndex(lemma_source(), max_distance=1)
+        except Exception:
+            logger.exception("Could not build the lemma search index")
+        finally:
+            self._lemmas_pending = False
+
+    def _rebuild_words(self, version: object) -> None:
+        try:
+            self.words = SearchIndex(self._word_source())
+            self._version = version
+        except Exception:
+            logger.exception("Could not rebuild the word search index")
+        finally:
+            self._rebuild_lock.release()
+
+    def _current_words(self) -> SearchIndex:
+        version = self._version_source()
+        # At most one rebuild at a time; a failed one is retried on a later request
+        if version != self._version and self._rebuild_lock.acquire(blocking=False):
+            threading.Thread(target=self._rebuild_words, args=(version,),
+                             name="word-index", daemon=True).start()
+        return self.words
+
+    @property
+    def ready(self) -> bool:
+        """Whether results are final: no index is being built or rebuilt."""
+        return not self._lemmas_pending and self._version_source() == self._version
+
+    def complete(self, query: str, limit: int = 10) -> List[str]:
+        """Prefix completions, word-list words first."""
+        found = self._current_words().prefix(query, limit)
+        if self.lemmas is not None and len(found) < limit:
+            found += [w for w in self.lemmas.prefix(query, limit) if w not in found]
+        return [display(w) for w in found[:limit]]
+
+    def suggest(self, query: str, limit: int = 5) -> List[str]:
+        """Spelling suggestions, closest first; word-list words win ties."""
+        key = normalize(query)
+        sources = [self._current_words()]
+        if self.lemmas is not None:
+            sources.append(self.lemmas)
+        scored = [
+            (distance, source, abs(len(word) - len(key)), word)
+            for source, index in enumerate(sources)
+            for word, distance in index.suggest(query, limit)
+        ]
+        seen, found = set(), []
+        for _, _, _, word in sorted(scored):
+            if word not in seen and word != key:
+                seen.add(word)
+                found.append(display(word))
+        return found[:limit]
+
+    def is_known(self, word: str) -> Optional[bool]:
+        """Whether ``word`` is indexed; ``None`` until the lemma index is ready."""
+        if word in self._current_words():
+            return True
+        if self.lemmas is None:
+            return None
+        return word in self.lemmas
+
+
+def lemma_source() -> Iterable[str]:
+    """All WordNet lemmas, from the lexicon index when one is configured."""
+    index_path = os.getenv("VOCAB_LEXICON_INDEX")
+    if index_path:
+        from vocab.lexicon_index import LexiconIndex
+
+        return list(LexiconIndex(index_path).keys())
+    from vocab.word_details import load_wordnet
+
+    return list(load_wordnet().all_lemma_names())
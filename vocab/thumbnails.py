@@ -0,0 +1,152 @@
+"""Thumbnail generation for downloaded images.
+
+Each downloaded image is validated and resized to a few fixed widths in a
+process pool.  Thumbnails are stored content-addressed under
+``static/images/cas/<hh>/<sha256>-<width>.<ext>``, so the same picture
+downloaded for several words is only stored and resized once.
+
+Pillow is optional: without it no thumbnails are generated and the
+``/images`` route keeps serving the originals.
+
+Originals are kept after their thumbnails exist.  The image index records
+them (size, hash, dimensions) and joins thumbnails through them, they are
+what ``python -m vocab.image_index reconcile`` rebuilds the index from, and
+they are served whenever a thumbnail is missing.  The directory therefore
+grows with every word whose images are fetched (at most
+``word_images.IMAGES_PER_WORD`` originals plus their thumbnails per word);
+clear it together with the ``images`` rows to reclaim space.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+try:
+    from PIL import Image, features
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+THUMBNAIL_WIDTHS = (160, 320, 640)
+CAS_DIR = "cas"
+
+logger = logging.getLogger(__name__)
+
+
+class Thumbnails(NamedTuple):
+    sha256: str
+    # width -> path relative to the images directory
+    paths: Dict[int, str]
+
+
+def available() -> bool:
+    return Image is not None
+
+
+def _format() -> tuple[str, str]:
+    if features.check("webp"):
+        return "WEBP", ".webp"
+    return "JPEG", ".jpg"
+
+
+def generate(source: str, home_dir: str, widths=THUMBNAIL_WIDTHS) -> Optional[Thumbnails]:
+    """Validate ``source`` and write its thumbnails below ``home_dir``.
+
+    Returns ``None`` if the file is not a readable image.  Existing
+    thumbnails for the same content are reused.  Runs in worker processes.
+    """
+    data = Path(source).read_bytes()
+    sha256 = hashlib.sha256(data).hexdigest()
+    image_format, extension = _format()
+    relative_dir = Path(CAS_DIR) / sha256[:2]
+    target_dir = Path(home_dir) / relative_dir
+    paths = {width: str(relative_dir / f"{sha256}-{width}{extension}") for width in widths}
+    if all((Path(home_dir) / path).exists() for path in paths.values()):
+        return Thumbnails(sha256, paths)
+
+    try:
+        with Image.open(source) as image:
+            image.verify()
+        with Image.open(source) as image:
+            image.load()
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+            if image_format == "JPEG" and image.mode == "RGBA":
+                image = image.convert("RGB")
+            target_dir.mkdir(parents=True, exist_ok=True)
+            for width, path in paths.items():
+                # Never upscale; small sources just get re-encoded
+                height = max(1, round(image.height * min(width, image.width) / image.width))
+                resized = image.resize((min(width, image.width), height), Image.LANCZOS)
+                target = Path(home_dir) / path
+                # Unique per process: duplicate content may be resized concurrently
+                tmp = target.with_name(f"{target.name}.{os.getpid()}.part")
+                resized.save(tmp, image_format, quality=80)
+                os.replace(tmp, target)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.info("Skipping thumbnails for %s: %s", source, exc)
+        return None
+    return Thumbnails(sha256, paths)
+
+
+class ThumbnailPipeline:
+    """Generate thumbnails for downloaded files in a process pool.
+
+    New thumbnails are published to ``store`` (by default the image store
+    configured for ``home_dir``).
+    """
+
+    def __init__(self, home_dir: str, index=None, workers: Optional[int] = None, store=None) -> None:
+        from vocab.image_index import default_index
+        from vocab.image_store import default_image_store
+
+        self.home_dir = home_dir
+        self.index = index if index is not None else default_index()
+        self.store = store if store is not None else default_image_store(home_dir)
+        self.workers = workers or int(os.getenv("VOCAB_THUMBNAIL_WORKERS", "2"))
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Forking a worker that runs an event loop and thread pools can
+            # copy locks held by other threads, so start clean interpreters
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    async def process(self, filenames: List[str]) -> Dict[str, Thumbnails]:
+        """Create and index thumbnails for ``filenames`` in the images directory."""
+        # Files reused from another node were processed where they were downloaded
+        filenames = [name for name in filenames if os.path.isfile(os.path.join(self.home_dir, name))]
+        if not available() or not filenames:
+            return {}
+        loop = asyncio.get_running_loop()
+        pool = self._executor()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(pool, generate, os.path.join(self.home_dir, name), self.home_dir)
+            for name in filenames
+        ), return_exceptions=True)
+        created = {}
+        for name, result in zip(filenames, results):
+            if isinstance(result, Thumbnails):
+                await asyncio.to_thread(self._publish, result)
+                await asyncio.to_thread(self.index.add_thumbnails, result.sha256, result.paths)
+                created[name] = result
+            elif isinstance(result, Exception):
+                logger.warning("Thumbnail generation failed for %s: %s", name, result)
+        return created
+
+    def _publish(self, thumbnails: Thumbnails) -> None:
+        for path in thumbnails.paths.values():
+            self.store.save(path, Path(self.home_dir) / path)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
@@ -3,16 +3,55 @@
 from __future__ import annotations
 
 import random
+import threading
+import time
 from pathlib import Path
-from typing import List
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+from vocab.sampling import AliasTable, new_seed, shuffle_step
+
+
+class _WordList(NamedTuple):
+    words: Tuple[str, ...]
+    mtime: Optional[float]
+    weights: Optional[AliasTable]
 
 
 class WordPicker:
-    """Load and pick words from ``wordlist.txt``."""
+    """Load and pick words from ``wordlist.txt``.
+
+    Every pick is O(1) regardless of the list size:
+
+    * :meth:`pick` draws uniformly, or by weight when a ``weight_fn`` is
+      given (e.g. to favour words that are not cached yet), using an alias
+      table.  The table is rebuilt when the list changes, after
+      :meth:`invalidate_weights` and at least every ``weights_max_age``
+      seconds, so writes by other workers are picked up too.
+    * :meth:`pick_next` walks a per-session shuffle without repeats; the
+      whole walk is described by a small state dict suitable for a cookie.
+
+    The file is checked for changes at most every ``reload_interval``
+    seconds and reloaded on a background thread, so requests keep using the
+    previous list until the new one is ready.
+    """
 
-    def __init__(self, word_file: str = "wordlist.txt") -> None:
+    def __init__(self, word_file: str = "wordlist.txt", reload_interval: float = 5.0,
+                 weight_fn: Optional[Callable[[Sequence[str]], Sequence[float]]] = None,
+                 weights_max_age: float = 300.0) -> None:
         self.word_file = Path(word_file)
-        self._words: List[str] = self._load_words()
+        self.reload_interval = reload_interval
+        self.weight_fn = weight_fn
+        self.weights_max_age = weights_max_age
+        self._weights_stale = False
+        self._reload_lock = threading.Lock()
+        self._next_check = time.monotonic() + reload_interval
+        self._list = self._load()
+
+    def _mtime(self) -> Optional[float]:
+        try:
+            return self.word_file.stat().st_mtime
+        except FileNotFoundError:
+            return None
 
     def _load_words(self) -> List[str]:
         if not self.word_file.exists():
@@ -20,14 +59,93 @@ class WordPicker:
         with self.word_file.open("r", encoding="utf-8") as f:
             return [w.strip() for w in f.readlines() if w.strip()]
 
+    def _weights(self, words: Tuple[str, ...]) -> Optional[AliasTable]:
+        self._weights_stale = False
+        self._weights_built = time.monotonic()
+        if self.weight_fn is None or not words:
+            return None
+        return AliasTable(list(self.weight_fn(words)))
+
+    def _load(self) -> _WordList:
+        mtime = self._mtime()
+        words = tuple(self._load_words())
+        return _WordList(words, mtime, self._weights(words))
+
+    def _weights_expired(self) -> bool:
+        return self.weight_fn is not None and (
+            self._weights_stale or time.monotonic() - self._weights_built >= self.weights_max_age)
+
+    def _reload_if_changed(self) -> None:
+        try:
+            if self._mtime() != self._list.mtime:
+                self._list = self._load()
+            elif self._weights_expired():
+                current = self._list
+                self._list = current._replace(weights=self._weights(current.words))
+        finally:
+            self._reload_lock.release()
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now < self._next_check or not self._reload_lock.acquire(blocking=False):
+            return
+        self._next_check = now + self.reload_interval
+        threading.Thread(target=self._reload_if_changed, name="wordlist-reload", daemon=True).start()
+
+    def reload(self) -> None:
+        """Reload the word list (and weights) synchronously."""
+        with self._reload_lock:
+            self._list = self._load()
+
+    def invalidate_weights(self) -> None:
+        """Recompute the weights on the next background check, e.g. after words were stored."""
+        self._weights_stale = True
+
+    @property
+    def mtime(self) -> Optional[float]:
+        """Modification time of the currently loaded word file."""
+        return self._list.mtime
+
+    @property
+    def words(self) -> List[str]:
+        """All words in the list, in file order."""
+        return list(self._list.words)
+
     def pick(self) -> str:
-        """Return a random word from the list."""
-        if not self._words:
+        """Return a random word from the list, weighted if configured."""
+        self._maybe_reload()
+        current = self._list
+        if not current.words:
             raise ValueError("word list is empty")
-        return random.choice(self._words)
+        if current.weights is not None:
+            return current.words[current.weights.sample()]
+        return random.choice(current.words)
+
+    def pick_next(self, state: Optional[dict] = None) -> Tuple[str, dict]:
+        """Return the next word of a no-repeat shuffle and the updated state.
+
+        ``state`` is the dict returned by the previous call (``None`` starts
+        a new shuffle).  A new pass begins when the list is exhausted or its
+        size changes.
+        """
+        self._maybe_reload()
+        words = self._list.words
+        if not words:
+            raise ValueError("word list is empty")
+        state = state or {}
+        seed, position = state.get("seed"), state.get("position", 0)
+        if seed is None or state.get("size") != len(words):
+            seed, position = new_seed(), 0
+        index, seed, position = shuffle_step(len(words), seed, position)
+        return words[index], {"seed": seed, "position": position, "size": len(words)}
+
+
+_default_picker: Optional[WordPicker] = None
 
 
 # Maintain backwards compatibility for older imports
 def pick_random_word() -> str:
-    return WordPicker().pick()
-
+    global _default_picker
+    if _default_picker is None:
+        _default_picker = WordPicker()
+    return _default_picker.pick()
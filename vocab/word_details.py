@@ -2,35 +2,166 @@
 
 from __future__ import annotations
 
-from typing import Any
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, NamedTuple, Optional
 
-from nltk.corpus import wordnet
+from vocab.metrics import WORDNET_SECONDS
+
+logger = logging.getLogger(__name__)
+
+NO_DEFINITION = "No definitions found"
+ERROR_DEFINITION = "An error occurred"
+
+_wordnet_lock = threading.Lock()
+_wordnet = None
+
+
+def load_wordnet(download: bool = True):
+    """Return NLTK's WordNet reader, downloading the corpus once if it is missing.
+
+    NLTK is only imported here, on first use, so importing the app stays
+    fast and works offline when a lexicon index is configured.
+    """
+    global _wordnet
+    if _wordnet is None:
+        with _wordnet_lock:
+            if _wordnet is None:
+                from nltk.corpus import wordnet
+
+                try:
+                    wordnet.ensure_loaded()
+                except LookupError:
+                    if not download:
+                        raise
+                    import nltk
+
+                    nltk.download("wordnet", quiet=True)
+                    wordnet.ensure_loaded()
+                _wordnet = wordnet
+    return _wordnet
+
+
+class Sense(NamedTuple):
+    """One WordNet sense of a word."""
+
+    pos: str                     # WordNet part of speech: n, v, a, s or r
+    definition: str
+    examples: tuple[str, ...]
+    synonyms: tuple[str, ...]    # most frequent first
+    antonyms: tuple[str, ...]
+
+
+class WordDetails(NamedTuple):
+    """Result of a lookup.
+
+    ``definition`` is the first sense's definition, or :data:`NO_DEFINITION`
+    / :data:`ERROR_DEFINITION` (with no senses) when there is nothing to store.
+    """
+
+    definition: str
+    senses: tuple[Sense, ...]
+
+
+POS_NAMES = {"n": "noun", "v": "verb", "a": "adjective", "s": "adjective", "r": "adverb"}
+
+
+def pack_senses(senses: Iterable[Sense]) -> str:
+    """Encode ``senses`` as compact JSON (one array per sense)."""
+    return json.dumps([list(sense) for sense in senses], separators=(",", ":"), ensure_ascii=False)
+
+
+def unpack_senses(data: Optional[str]) -> tuple[Sense, ...]:
+    """Inverse of :func:`pack_senses`; ``None`` or ``""`` decode to no senses."""
+    if not data:
+        return ()
+    return tuple(Sense(pos, definition, tuple(examples), tuple(synonyms), tuple(antonyms))
+                 for pos, definition, examples, synonyms, antonyms in json.loads(data))
+
+
+def ranked_synonyms(senses: Iterable[Sense]) -> list[str]:
+    """Distinct synonyms of all ``senses``, in sense order then frequency order."""
+    return list(dict.fromkeys(synonym for sense in senses for synonym in sense.synonyms))
+
+
+def _synset_sense(synset: Any) -> tuple[str, str, tuple[str, ...], list[tuple[str, int]], tuple[str, ...]]:
+    # Everything about a synset that does not depend on the word looked up;
+    # ``lemma.count()`` is WordNet's tagged corpus frequency
+    lemmas = [(lemma.name(), lemma.count()) for lemma in synset.lemmas()]
+    antonyms = tuple(dict.fromkeys(antonym.name()
+                                   for lemma in synset.lemmas() for antonym in lemma.antonyms()))
+    return synset.pos(), synset.definition(), tuple(synset.examples()), lemmas, antonyms
+
+
+def senses_from_synsets(word: str, synsets: list[Any],
+                        cache: Optional[dict[str, tuple]] = None) -> tuple[Sense, ...]:
+    """Extract every sense of ``word`` from its WordNet ``synsets``.
+
+    Synonyms are the synset's other lemmas ranked by corpus frequency (ties
+    keep WordNet's order), so results are the same in every process.  Pass
+    the same ``cache`` dict when extracting many words: synsets shared
+    between words are then only read once.
+    """
+    key = word.lower().replace(" ", "_")
+    senses = []
+    for synset in synsets:
+        extracted = None if cache is None else cache.get(synset.name())
+        if extracted is None:
+            extracted = _synset_sense(synset)
+            if cache is not None:
+                cache[synset.name()] = extracted
+        pos, definition, examples, lemmas, antonyms = extracted
+        ranked = sorted(lemmas, key=lambda lemma: -lemma[1])
+        synonyms = tuple(name for name, _ in ranked if name.lower() != key)
+        senses.append(Sense(pos, definition, examples, synonyms, antonyms))
+    return tuple(senses)
 
 
 class WordDetailsService:
-    """Retrieve definitions and synonyms using NLTK's WordNet."""
+    """Retrieve every sense of a word using NLTK's WordNet.
+
+    When ``index_path`` (or the ``VOCAB_LEXICON_INDEX`` environment variable)
+    points at an index built by :mod:`vocab.lexicon_index`, lookups are served
+    from that memory-mapped file and NLTK is never imported.
+    """
 
-    def get_details(self, word: str) -> tuple[str, list[str]]:
+    def __init__(self, index_path: Optional[str] = None) -> None:
+        if index_path is None:
+            index_path = os.getenv("VOCAB_LEXICON_INDEX") or None
+        self.index = None
+        if index_path is not None:
+            from vocab.lexicon_index import LexiconIndex
+
+            self.index = LexiconIndex(index_path)
+
+    def _lookup(self, word: str, synset_cache: Optional[dict] = None) -> tuple[Sense, ...]:
+        if self.index is not None:
+            with WORDNET_SECONDS.time(source="index"):
+                return self.index.lookup(word) or ()
+        wordnet = load_wordnet()
+        with WORDNET_SECONDS.time(source="nltk"):
+            return senses_from_synsets(word, wordnet.synsets(word), synset_cache)
+
+    def get_details(self, word: str, synset_cache: Optional[dict] = None) -> WordDetails:
         try:
-            synsets: list[Any] = wordnet.synsets(word)
-            if synsets:
-                first_synset = synsets[0]
-                definition = first_synset.definition()
-                # Get all lemmas and filter out the original word
-                all_synonyms = [lemma.name() for synset in synsets for lemma in synset.lemmas()]
-                # Remove the original word (case-insensitive) and duplicates
-                filtered_synonyms = list(set([
-                    synonym for synonym in all_synonyms 
-                    if synonym.lower() != word.lower()
-                ]))
-                return definition, filtered_synonyms[:5]
-            return "No definitions found", []
-        except Exception as exc:  # pragma: no cover - defensive
-            print("Exception is", exc)
-            return "An error occurred", []
+            senses = self._lookup(word, synset_cache)
+        except Exception:  # pragma: no cover - defensive
+            logger.exception("Looking up %r failed", word)
+            return WordDetails(ERROR_DEFINITION, ())
+        if not senses:
+            return WordDetails(NO_DEFINITION, ())
+        return WordDetails(senses[0].definition, senses)
+
+    def get_many(self, words: Iterable[str]) -> Dict[str, WordDetails]:
+        """Look up ``words`` in one pass, sharing synset extraction between them."""
+        synset_cache: dict = {}
+        return {word: self.get_details(word, synset_cache) for word in dict.fromkeys(words)}
 
 
 # Backwards compatible helper
 
 def get_definition_synonyms(word: str) -> tuple[str, list[str]]:
-    return WordDetailsService().get_details(word)
+    definition, senses = WordDetailsService().get_details(word)
+    return definition, ranked_synonyms(senses)[:5]
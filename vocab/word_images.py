@@ -4,18 +4,69 @@ from __future__ import annotations
 
 import os
 import asyncio
-import aiohttp
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List
-from functools import lru_cache
+from typing import Callable, Optional
 from duckduckgo_search import DDGS
-import random
-import time
+
+from vocab.cache_store import PersistentCache, default_cache
+from vocab.image_index import ImageIndex, default_index
+from vocab.image_store import default_image_store
+from vocab.metrics import (IMAGE_DOWNLOAD_BYTES, IMAGE_DOWNLOAD_SECONDS, IMAGE_SEARCH_SECONDS, IN_FLIGHT,
+                           cache_result)
+from vocab.rate_limit import SEARCH_HOST, RateLimiter, default_limiter, shared_session
+
+logger = logging.getLogger(__name__)
+
+# Cache namespaces for search results and the files downloaded for a keyword
+SEARCH_NAMESPACE = "image_search"
+DOWNLOAD_NAMESPACE = "image_files"
+
+# Images kept per word; downloading stops once this many have succeeded
+IMAGES_PER_WORD = 3
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class ImageTooLarge(Exception):
+    """Raised when a download exceeds ``max_image_bytes``."""
+
+
+# Writes of partially downloaded files; see ImageDownloader._stream_to_file
+_file_io = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-io")
+
+
+def _finish_partial(f, tmp_path: Path, filepath: Path) -> None:
+    f.close()
+    os.replace(tmp_path, filepath)
+
+
+def _discard_partial(opened: Future, pending: Future, tmp_path: Path) -> None:
+    # The last operation was submitted first, so it has already started
+    wait([pending])
+    if not opened.cancelled() and opened.exception() is None:
+        opened.result().close()
+    tmp_path.unlink(missing_ok=True)
 
 class ImageDownloader:
-    """Search and download images for a word."""
+    """Search and download images for a word.
+
+    Searches go to DuckDuckGo unless ``search_url`` (or the
+    ``VOCAB_IMAGE_SEARCH_URL`` environment variable) names an endpoint that
+    answers ``GET <search_url>?q=<keyword>`` with a JSON list of
+    ``{"image": url}`` results, such as ``benchmarks.stub_images``.
 
-    def __init__(self, headers=None):
+    Files are downloaded into ``home_dir`` and published to ``store`` (see
+    :mod:`vocab.image_store`; by default the one configured for
+    ``home_dir``) before they are reported.
+    """
+
+    def __init__(self, headers=None, cache: Optional[PersistentCache] = None,
+                 index: Optional[ImageIndex] = None, limiter: Optional[RateLimiter] = None,
+                 max_image_bytes: int = MAX_IMAGE_BYTES, search_url: Optional[str] = None,
+                 store=None):
         if headers is None:
             headers = {
                 "User-Agent": (
@@ -34,134 +85,242 @@ class ImageDownloader:
                 "Cache-Control": "max-age=0"
             }
         self.headers = headers
+        self.cache = cache if cache is not None else default_cache()
+        self.index = index if index is not None else default_index()
+        self.limiter = limiter if limiter is not None else default_limiter()
+        self.max_image_bytes = max_image_bytes
+        self.search_url = search_url or os.getenv("VOCAB_IMAGE_SEARCH_URL") or None
+        self.store = store
         self.session = None
         self._current_keyword = None
+        self._current_store = None
         self._user_agents = [
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15",
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0"
         ]
-        self._last_request_time = 0
-        self._min_request_interval = 2  # Minimum seconds between requests
         self._max_retries = 3
 
-    async def _wait_for_rate_limit(self):
-        """Implement exponential backoff for rate limiting."""
-        current_time = time.time()
-        time_since_last_request = current_time - self._last_request_time
-        
-        if time_since_last_request < self._min_request_interval:
-            wait_time = self._min_request_interval - time_since_last_request
-            # Add some jitter to prevent synchronized requests
-            wait_time += random.uniform(0, 1)
-            print(f"Rate limit: Waiting {wait_time:.2f} seconds before next request")
-            await asyncio.sleep(wait_time)
-        
-        self._last_request_time = time.time()
+    async def _wait_for_rate_limit(self, url_or_host=SEARCH_HOST):
+        """Wait for a token from the process-wide bucket of the request's host."""
+        await self.limiter.acquire(url_or_host)
 
-    @lru_cache(maxsize=1000)
     async def search(self, keyword, retry_count=0):
-        """Search for images with rate limit handling."""
+        """Search for images with rate limit handling.
+
+        Non-empty results are kept in the persistent cache, so repeat
+        searches from any worker are answered without the network.
+        """
+        if retry_count == 0:
+            cached = self.cache.get(SEARCH_NAMESPACE, keyword)
+            cache_result("image_search", cached is not None)
+            if cached is not None:
+                return cached
         if retry_count >= self._max_retries:
-            print(f"Max retries reached for keyword: {keyword}")
+            logger.warning("Max retries reached for keyword: %s", keyword)
             return []
 
+        search_host = self.search_url or SEARCH_HOST
         try:
-            await self._wait_for_rate_limit()
-            print(f"Searching for images with keyword: {keyword} (attempt {retry_count + 1})")
-            results = DDGS(headers=self.headers).images(keywords=keyword)
-            print(f"Found {len(results)} images for {keyword}")
-            return results[:10]  # Get more images to have alternatives if some fail
+            await self._wait_for_rate_limit(search_host)
+            logger.debug("Searching for images with keyword: %s (attempt %d)", keyword, retry_count + 1)
+            with IMAGE_SEARCH_SECONDS.time(), IN_FLIGHT.track_inprogress(operation="image_search"):
+                if self.search_url:
+                    results = await self._search_endpoint(keyword)
+                else:
+                    # DDGS is synchronous; keep it off the event loop
+                    results = await asyncio.to_thread(DDGS(headers=self.headers).images, keywords=keyword)
+            logger.debug("Found %d images for %s", len(results), keyword)
+            results = results[:10]  # Get more images to have alternatives if some fail
+            if results:
+                self.cache.set(SEARCH_NAMESPACE, keyword, results)
+            return results
         except Exception as e:
             if "RateLimit" in str(e) or "403" in str(e):
-                print(f"Rate limit hit for {keyword}, retrying in {2 ** retry_count} seconds...")
-                await asyncio.sleep(2 ** retry_count)  # Exponential backoff
+                logger.info("Rate limit hit for %s, retrying in %d seconds", keyword, 2 ** retry_count)
+                # Exponential backoff, shared with every other search in the process
+                self.limiter.penalize(search_host, 2 ** retry_count)
                 return await self.search(keyword, retry_count + 1)
-            print(f"Error searching images for {keyword}: {e}")
+            logger.warning("Error searching images for %s: %s", keyword, e)
             return []
 
+    async def _search_endpoint(self, keyword):
+        if self.session is None or self.session.closed:
+            self.session = shared_session()
+        async with self.session.get(self.search_url, params={"q": keyword}, timeout=8) as resp:
+            if resp.status in (403, 429):
+                raise RuntimeError(f"RateLimit: search endpoint returned {resp.status}")
+            resp.raise_for_status()
+            return await resp.json()
+
     async def _download_image(self, session, image_url, filepath, retry_count=0):
         if retry_count >= len(self._user_agents):
-            print(f"All retry attempts failed for {image_url}")
+            logger.info("All retry attempts failed for %s", image_url)
             return None
 
+        started = None
         try:
-            await self._wait_for_rate_limit()
-            print(f"Attempting to download image from: {image_url} (attempt {retry_count + 1})")
+            await self._wait_for_rate_limit(image_url)
+            logger.debug("Attempting to download image from: %s (attempt %d)", image_url, retry_count + 1)
             headers = self.headers.copy()
             headers["User-Agent"] = self._user_agents[retry_count]
-            
-            async with session.get(image_url, headers=headers, timeout=8) as resp:
-                if resp.status == 200:
-                    content = await resp.read()
-                    with filepath.open("wb") as f:
-                        f.write(content)
-                    print(f"Successfully downloaded image to: {filepath.name}")
-                    return filepath.name
-                elif resp.status in [403, 429]:  # Forbidden or Too Many Requests
-                    print(f"Access forbidden/rate limited for {image_url}, retrying with different user agent...")
-                    await asyncio.sleep(2 ** retry_count)  # Exponential backoff
-                    return await self._download_image(session, image_url, filepath, retry_count + 1)
-                else:
-                    print(f"Failed to download image. Status code: {resp.status}")
+
+            started = time.perf_counter()
+            with IN_FLIGHT.track_inprogress(operation="image_download"):
+                async with session.get(image_url, headers=headers, timeout=8) as resp:
+                    if resp.status == 200:
+                        content_type = resp.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                        if content_type and not content_type.startswith("image/"):
+                            logger.debug("Skipping %s: content type %s", image_url, content_type)
+                            IMAGE_DOWNLOAD_SECONDS.observe(time.perf_counter() - started, result="skipped")
+                            return None
+                        if resp.content_length and resp.content_length > self.max_image_bytes:
+                            logger.debug("Skipping %s: %d bytes", image_url, resp.content_length)
+                            IMAGE_DOWNLOAD_SECONDS.observe(time.perf_counter() - started, result="skipped")
+                            return None
+                        size = await self._stream_to_file(resp, filepath)
+                        IMAGE_DOWNLOAD_SECONDS.observe(time.perf_counter() - started, result="ok")
+                        IMAGE_DOWNLOAD_BYTES.observe(size)
+                        await asyncio.to_thread(self.index.add_file, self._current_keyword, filepath)
+                        await asyncio.to_thread(self._current_store.save, filepath.name, filepath)
+                        logger.debug("Successfully downloaded image to: %s", filepath.name)
+                        return filepath.name
+                    IMAGE_DOWNLOAD_SECONDS.observe(time.perf_counter() - started, result="failed")
+                    if resp.status in [403, 429]:  # Forbidden or Too Many Requests
+                        logger.info("Access forbidden/rate limited for %s, retrying with different user agent",
+                                    image_url)
+                        # Back off every request to this origin, not just this one
+                        self.limiter.penalize(image_url, 2 ** retry_count)
+                        return await self._download_image(session, image_url, filepath, retry_count + 1)
+                    logger.debug("Failed to download %s. Status code: %d", image_url, resp.status)
+        except ImageTooLarge as exc:
+            IMAGE_DOWNLOAD_SECONDS.observe(time.perf_counter() - started, result="skipped")
+            logger.debug("Skipping %s: %s", image_url, exc)
+            return None
         except Exception as exc:
-            print(f"Error downloading image {image_url}: {exc}")
+            if started is not None:
+                IMAGE_DOWNLOAD_SECONDS.observe(time.perf_counter() - started, result="failed")
+            logger.debug("Error downloading image %s: %s", image_url, exc)
             if retry_count < len(self._user_agents) - 1:
                 await asyncio.sleep(2 ** retry_count)  # Exponential backoff
                 return await self._download_image(session, image_url, filepath, retry_count + 1)
         return None
 
-    async def _download_images_async(self, images, path):
-        if not self.session:
-            self.session = aiohttp.ClientSession(headers=self.headers)
-        tasks = []
+    async def _stream_to_file(self, resp, filepath):
+        """Write the response body to ``filepath`` chunk by chunk.
+
+        Chunks go to a temporary file through a worker thread and the file is
+        renamed into place only once complete, so readers never see partial
+        images and at most one chunk is held in memory.  Returns the size
+        in bytes.
+
+        A cancelled or failed download leaves a write running in its thread,
+        so the temporary file is closed and removed by another task on the
+        same executor once that write is done, never underneath it.
+        """
+        tmp_path = filepath.with_name(f"{filepath.name}.part")
+        opened = pending = _file_io.submit(tmp_path.open, "wb")
+        completed = False
+        try:
+            f = await asyncio.wrap_future(opened)
+            size = 0
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                size += len(chunk)
+                if size > self.max_image_bytes:
+                    raise ImageTooLarge(f"more than {self.max_image_bytes} bytes")
+                pending = _file_io.submit(f.write, chunk)
+                await asyncio.wrap_future(pending)
+            pending = _file_io.submit(_finish_partial, f, tmp_path, filepath)
+            await asyncio.wrap_future(pending)
+            completed = True
+            return size
+        finally:
+            if not completed:
+                _file_io.submit(_discard_partial, opened, pending, tmp_path)
+
+    async def _download_images_async(self, images, path, on_image=None):
+        """Download until ``IMAGES_PER_WORD`` images succeed.
+
+        Only enough downloads to fill the remaining slots (plus one spare)
+        run at a time; a failure starts the next candidate and the rest are
+        cancelled as soon as enough images are saved.
+        """
+        if self.session is None or self.session.closed:
+            # Pooled keep-alive session shared by every downloader on this loop
+            self.session = shared_session()
+        candidates = []
         for i, image in enumerate(images):
             extension = os.path.splitext(image["image"])[1].lower()
             if not extension or len(extension) > 5:
                 extension = ".jpg"
             filename = f"{self._current_keyword}{i+1}{extension}"
-            filepath = path / filename
-            print(f"Creating download task for: {filename}")
-            task = self._download_image(self.session, image["image"], filepath)
-            tasks.append(task)
-        results = await asyncio.gather(*tasks)
-        successful_downloads = [r for r in results if r is not None]
-        print(f"Successfully downloaded {len(successful_downloads)} images for {self._current_keyword}")
-        return successful_downloads[:3]  # Return only the first 3 successful downloads
-
-    async def download_async(self, keyword, home_dir):
-        """Download images for a word."""
+            candidates.append((image["image"], path / filename))
+        candidates.reverse()
+
+        successful_downloads = []
+        running = set()
+        try:
+            while candidates or running:
+                needed = IMAGES_PER_WORD - len(successful_downloads)
+                while candidates and len(running) < needed + 1:
+                    image_url, filepath = candidates.pop()
+                    running.add(asyncio.ensure_future(
+                        self._download_image(self.session, image_url, filepath)))
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if result is not None and len(successful_downloads) < IMAGES_PER_WORD:
+                        successful_downloads.append(result)
+                        if on_image is not None:
+                            on_image(result)
+                if len(successful_downloads) >= IMAGES_PER_WORD:
+                    break
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        logger.info("Downloaded %d images for %s", len(successful_downloads), self._current_keyword)
+        return successful_downloads
+
+    async def download_async(self, keyword, home_dir, on_image: Optional[Callable[[str], None]] = None):
+        """Download images for a word.
+
+        ``on_image`` is called with each filename as soon as it is saved, so
+        callers can show partial results while the rest are downloading.
+        """
         self._current_keyword = keyword
+        store = self._current_store = self.store if self.store is not None else default_image_store(home_dir)
         path = Path(home_dir)
         path.mkdir(parents=True, exist_ok=True)
+
+        # Reuse files another worker (or node) already published, if they are still there
+        cached = self.cache.get(DOWNLOAD_NAMESPACE, keyword)
+        hit = bool(cached) and await asyncio.to_thread(lambda: all(store.exists(name) for name in cached))
+        cache_result("image_files", hit)
+        if hit:
+            return cached
         
         # Search for images with rate limit handling
         images = await self.search(keyword)
         if not images:
-            print(f"No images found for {keyword}")
+            logger.info("No images found for %s", keyword)
             return []
         
         # Download images
-        return await self._download_images_async(images, path)
+        downloaded = await self._download_images_async(images, path, on_image)
+        if downloaded:
+            self.cache.set(DOWNLOAD_NAMESPACE, keyword, downloaded)
+        return downloaded
 
     async def close(self):
-        """Close the aiohttp session."""
-        if self.session:
-            await self.session.close()
-            self.session = None
-
-    def __del__(self):
-        """Cleanup when the object is deleted."""
-        if self.session:
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    loop.create_task(self.close())
-                else:
-                    loop.run_until_complete(self.close())
-            except Exception:
-                pass
+        """Release the session; the shared session itself stays open for reuse.
+
+        Use :func:`vocab.rate_limit.close_shared_session` when the event loop
+        is shutting down.
+        """
+        self.session = None
 
 # Backwards compatibility
 def download_images(keyword, home_dir):